@@ -0,0 +1,352 @@
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import main
+
+# Lato (SIL Open Font License, see fixtures/fonts/OFL.txt) is bundled so
+# rendering numbers do not depend on which default font Pillow ships
+BENCHMARK_FONT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'fonts',
+                              'Lato-Regular.ttf')
+
+SEGMENT_COUNTS = (10, 1000, 10000)
+STAGES = ('startup', 'extract_audio', 'transcribe_audio', 'timeline', 'generate_frame',
+          'generate_frames', 'create_final_video', 'encode')
+ENCODE_MODES = ('events', 'stream', 'segments')
+
+# Fresh interpreters timed by the startup stage: importing main, and the CLI
+# answering --help
+STARTUP_COMMANDS = {
+    'import': ['-c', 'import main'],
+    'help': ['main.py', '--help'],
+}
+
+# Canned transcript shape: every segment has this many words of fixed length
+# followed by a short pause
+WORDS_PER_SEGMENT = 8
+WORD_SECONDS = 0.3
+GAP_SECONDS = 0.4
+VOCABULARY = ("we", "are", "going", "to", "give", "away", "one", "million", "dollars", "today",
+              "if", "you", "can", "last", "longest", "in", "this", "circle", "challenge", "wins")
+
+def make_transcription(segment_count):
+    # Deterministic Whisper-style segments with word timestamps
+    data = []
+    start = 0.0
+    for index in range(segment_count):
+        words = []
+        for position in range(WORDS_PER_SEGMENT):
+            word_start = start + position * WORD_SECONDS
+            text = VOCABULARY[(index * 7 + position * 3) % len(VOCABULARY)]
+            words.append({'text': ' ' + text, 'start': word_start, 'end': word_start + WORD_SECONDS})
+        end = words[-1]['end']
+        data.append({
+            'text': ''.join(word['text'] for word in words),
+            'start': start,
+            'end': end,
+            'words': words,
+        })
+        start = end + GAP_SECONDS
+    return data
+
+class StubModel:
+    # Stands in for a Whisper model: returns a canned transcript instantly so
+    # the surrounding transcribe_audio work can be timed offline
+    def __init__(self, segment_count):
+        self.segments = make_transcription(segment_count)
+
+    def transcribe(self, audio, **options):
+        return {'segments': self.segments}
+
+def make_audio(seconds, sample_rate=48000):
+    # Stereo tone with a slow amplitude envelope plus noise, as float32
+    rng = np.random.default_rng(1234)
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 0.25 * t)
+    tone = 0.2 * envelope * np.sin(2 * np.pi * 220 * t)
+    left = tone + 0.02 * rng.standard_normal(t.size).astype(np.float32)
+    right = tone + 0.02 * rng.standard_normal(t.size).astype(np.float32)
+    return np.stack([left, right], axis=1).astype(np.float32), sample_rate
+
+def make_video(path, seconds):
+    # Small synthetic video whose audio track is the generated tone/noise
+    audio, sample_rate = make_audio(seconds)
+    command = [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'f32le', '-ar', str(sample_rate), '-ac', '2', '-i', 'pipe:',
+        '-f', 'lavfi', '-i', f'color=c=black:s=320x240:r=30:d={seconds}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac', '-shortest', path,
+    ]
+    subprocess.run(command, input=audio.tobytes(), check=True)
+
+def peak_rss_mb(who):
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def make_job(work_dir, font_path, video_path=None, **options):
+    options.setdefault('render_mode', 'frames')
+    return main.CaptionJob(video_path, font_path, work_dir, status_callback=lambda message: None,
+                           use_cache=False, **options)
+
+def stage_startup(params, work_dir):
+    # Startup has to be timed in a new interpreter; this process has already
+    # imported main
+    command = [sys.executable] + STARTUP_COMMANDS[params['command']]
+    started = time.perf_counter()
+    subprocess.run(command, cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started, {}
+
+def stage_extract_audio(params, work_dir):
+    video_path = os.path.join(work_dir, 'fixture.mp4')
+    make_video(video_path, params['audio_seconds'])
+    job = make_job(work_dir, params['font_path'], video_path)
+    started = time.perf_counter()
+    audio = job.extract_audio(video_path)
+    return time.perf_counter() - started, {'samples': int(audio.size)}
+
+def stage_transcribe_audio(params, work_dir):
+    audio, _ = make_audio(params['audio_seconds'], main.WHISPER_SAMPLE_RATE)
+    audio = np.ascontiguousarray(audio[:, 0])
+    job = make_job(work_dir, params['font_path'])
+    if params['model'] == 'stub':
+        main.whisper_models.models['stub'] = StubModel(params['segments'])
+    job.model_name = params['model']
+    started = time.perf_counter()
+    job.transcribe_audio(audio)
+    return time.perf_counter() - started, {'segments_out': len(job.transcription_data)}
+
+def stage_timeline(params, work_dir):
+    job = make_job(work_dir, params['font_path'])
+    job.transcription_data = job.segment_records(make_transcription(params['segments']))
+    started = time.perf_counter()
+    states = job.caption_states()
+    return time.perf_counter() - started, {'frames': job.total_frames(), 'states': len(states)}
+
+def stage_generate_frame(params, work_dir):
+    job = make_job(work_dir, params['font_path'])
+    texts = [' '.join(VOCABULARY[(i + j) % len(VOCABULARY)] for j in range(6))
+             for i in range(params['frame_count'])]
+    started = time.perf_counter()
+    for index, text in enumerate(texts):
+        job.generate_frame(text, os.path.join(work_dir, f"frame_{index:06d}.jpg"))
+    return time.perf_counter() - started, {'frames': len(texts)}
+
+def stage_generate_frames(params, work_dir):
+    job = make_job(work_dir, params['font_path'])
+    job.transcription_data = job.segment_records(make_transcription(params['segments']))
+    started = time.perf_counter()
+    job.generate_frames()
+    return time.perf_counter() - started, {'frames': job.total_frames()}
+
+def stage_create_final_video(params, work_dir):
+    video_path = os.path.join(work_dir, 'fixture.mp4')
+    job = make_job(work_dir, params['font_path'], video_path)
+    job.transcription_data = job.segment_records(make_transcription(params['segments']))
+    make_video(video_path, job.total_frames() / 30 + 1)
+    frames_dir = job.generate_frames()
+    started = time.perf_counter()
+    job.create_final_video(frames_dir, os.path.join(work_dir, 'output.mp4'))
+    return time.perf_counter() - started, {'frames': job.total_frames()}
+
+def stage_encode(params, work_dir):
+    # Encoder throughput of one render mode and x264 preset at the default
+    # 1920x1080 canvas
+    job = make_job(work_dir, params['font_path'], render_mode=params['render_mode'],
+                   encoder_preset=params['preset'], encode_workers=params['encode_workers'])
+    job.transcription_data = job.segment_records(make_transcription(params['segments']))
+    encode = {
+        'events': job.encode_caption_events,
+        'stream': job.stream_final_video,
+        'segments': job.encode_segments,
+    }[params['render_mode']]
+    output_path = os.path.join(work_dir, 'output.mp4')
+    started = time.perf_counter()
+    encode(output_path, os.path.join(work_dir, 'preview.png'), job.frame_rate())
+    return time.perf_counter() - started, {'frames': job.total_frames(),
+                                           'output_bytes': os.path.getsize(output_path)}
+
+STAGE_FUNCTIONS = {
+    'startup': stage_startup,
+    'extract_audio': stage_extract_audio,
+    'transcribe_audio': stage_transcribe_audio,
+    'timeline': stage_timeline,
+    'generate_frame': stage_generate_frame,
+    'generate_frames': stage_generate_frames,
+    'create_final_video': stage_create_final_video,
+    'encode': stage_encode,
+}
+
+def run_stage(stage, params):
+    # Runs in a fresh process so peak RSS belongs to this stage alone
+    work_dir = tempfile.mkdtemp(prefix=f"bench_{stage}_")
+    try:
+        wall_seconds, details = STAGE_FUNCTIONS[stage](params, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    result = {
+        'stage': stage,
+        'params': {key: value for key, value in params.items() if key != 'font_path'},
+        'wall_seconds': round(wall_seconds, 4),
+        'peak_rss_mb': peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        'peak_rss_children_mb': peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+    }
+    result.update(details)
+    if 'frames' in details and wall_seconds > 0:
+        result['frames_per_second'] = round(details['frames'] / wall_seconds, 1)
+    return result
+
+def stage_key(result):
+    return result['stage'], json.dumps(result['params'], sort_keys=True)
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def plan(args):
+    # (stage, params) pairs; each stage only gets the parameters it uses
+    runs = []
+    for stage in args.stages:
+        params = {'font_path': args.font}
+        if stage == 'startup':
+            runs.extend((stage, {'command': command}) for command in STARTUP_COMMANDS)
+        elif stage == 'extract_audio':
+            runs.append((stage, dict(params, audio_seconds=args.audio_seconds)))
+        elif stage == 'transcribe_audio':
+            runs.extend((stage, dict(params, audio_seconds=args.audio_seconds, model=args.model,
+                                     segments=count)) for count in args.segments)
+        elif stage == 'timeline':
+            runs.extend((stage, dict(params, segments=count)) for count in args.segments)
+        elif stage == 'generate_frame':
+            runs.append((stage, dict(params, frame_count=args.frame_count)))
+        elif stage == 'encode':
+            for count in args.frame_segments:
+                for render_mode in args.encode_modes:
+                    for preset in args.presets:
+                        run_params = dict(params, segments=count, render_mode=render_mode, preset=preset)
+                        if render_mode == 'segments':
+                            run_params['encode_workers'] = args.encode_workers
+                        else:
+                            run_params['encode_workers'] = 1
+                        runs.append((stage, run_params))
+        else:
+            runs.extend((stage, dict(params, segments=count)) for count in args.frame_segments)
+    return runs
+
+def compare(results, baseline_path, threshold):
+    # Prints wall time ratios against an earlier results file and returns
+    # the stages that got slower than the threshold allows
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {stage_key(result): result for result in json.load(f)['results']}
+
+    regressions = []
+    print(f"\n{'Stage':<20} {'Params':<40} {'Before':>9} {'After':>9} {'Ratio':>7}")
+    for result in results:
+        before = baseline.get(stage_key(result))
+        if before is None:
+            continue
+        ratio = result['wall_seconds'] / max(before['wall_seconds'], 1e-9)
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{result['stage']:<20} {json.dumps(result['params'], sort_keys=True):<40} "
+              f"{before['wall_seconds']:>9.3f} {result['wall_seconds']:>9.3f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Offline benchmark of every caption pipeline stage on synthetic fixtures.")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--segments', nargs='+', type=int, default=list(SEGMENT_COUNTS),
+                        help="transcript sizes for the transcription and timeline stages")
+    parser.add_argument('--frame-segments', nargs='+', type=int, default=[10],
+                        help="transcript sizes for the stages that render every frame")
+    parser.add_argument('--audio-seconds', type=float, default=60,
+                        help="length of the synthetic audio (default: 60)")
+    parser.add_argument('--frame-count', type=int, default=100,
+                        help="captions rendered by the generate_frame stage (default: 100)")
+    parser.add_argument('--encode-modes', nargs='+', choices=ENCODE_MODES, default=list(ENCODE_MODES),
+                        help="render modes timed by the encode stage")
+    parser.add_argument('--presets', nargs='+', choices=list(main.ENCODER_PRESETS),
+                        default=list(main.ENCODER_PRESETS), help="x264 presets timed by the encode stage")
+    parser.add_argument('--encode-workers', type=int, default=4,
+                        help="processes used by the 'segments' encode mode (default: 4)")
+    parser.add_argument('--model', default='stub',
+                        help="'stub' for a canned transcript, or a Whisper model name")
+    parser.add_argument('--font', default=BENCHMARK_FONT,
+                        help="font file (default: the bundled Lato Regular fixture)")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per stage; the fastest is kept")
+    parser.add_argument('--output', help="results JSON (default: benchmark_results/<commit>.json)")
+    parser.add_argument('--compare', help="earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="allowed slowdown before --compare reports a regression (default: 0.1)")
+    return parser.parse_args(argv)
+
+def main_benchmark(argv=None):
+    args = parse_args(argv)
+    commit = git_commit()
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for stage, params in plan(args):
+        best = None
+        for _ in range(args.repeat):
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(run_stage, stage, params).result()
+            if best is None or result['wall_seconds'] < best['wall_seconds']:
+                best = result
+        results.append(best)
+        fps = f"{best['frames_per_second']:>10.1f} fps" if 'frames_per_second' in best else ""
+        print(f"{stage:<20} {json.dumps(best['params'], sort_keys=True):<40} "
+              f"{best['wall_seconds']:>9.3f} s  {best['peak_rss_mb'] or 0:>8.1f} MB{fps}", flush=True)
+
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'font': os.path.basename(args.font),
+        },
+        'results': results,
+    }
+
+    output = args.output or os.path.join('benchmark_results', f"{(commit or 'unknown')[:12]}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than the {args.threshold:.0%} threshold")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
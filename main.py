@@ -1,25 +1,2307 @@
 import os
-import tkinter as tk
-from tkinter import filedialog, ttk, messagebox
-from tkinterdnd2 import TkinterDnD, DND_FILES
-import moviepy.editor
-import whisper
-from PIL import Image, ImageDraw, ImageFont, ImageTk
+from PIL import Image, ImageDraw, ImageFont
 import ffmpeg
 import threading
-import cv2
+import queue
 import numpy as np
 from pathlib import Path
 import shutil
 import time
 import subprocess
 import sys
+import bisect
+import math
+import hashlib
+import json
+import multiprocessing
+import concurrent.futures
+import argparse
+import glob
+import tempfile
+import contextlib
+import cProfile
+from collections import OrderedDict
+
+# 'frames' writes a JPEG per frame and encodes the sequence afterwards,
+# 'stream' pipes raw frames into ffmpeg as they are rendered,
+# 'events' renders one still per caption change and has ffmpeg hold it,
+# 'ass' exports an ASS subtitle file that libass draws inside ffmpeg and
+# 'segments' splits the timeline at caption changes, streams the pieces
+# through parallel encoder processes and joins them without re-encoding and
+# 'incremental' transcribes and streams the audio window by window, so
+# captions come out while the input is still being read
+RENDER_MODES = ('frames', 'stream', 'events', 'ass', 'segments', 'incremental')
+
+# 'greenscreen' writes opaque captions on green for chroma keying, 'burnin'
+# overlays the captions onto the source video in a single encode and
+# 'alpha' writes the captions with a transparent background
+OUTPUT_MODES = ('greenscreen', 'burnin', 'alpha')
+GREEN_SCREEN_COLOR = (0, 255, 0)
+
+# Canvas and frame rate used when there is no source video to match
+DEFAULT_CANVAS_SIZE = (1920, 1080)
+DEFAULT_FPS = 30
+
+# Caption font size on a frame whose shorter side is 1080 px; other
+# canvases scale it, so captions keep their size relative to the frame
+BASE_FONT_SIZE = 120
+
+# Only the band of the frame that captions ever cover is rendered; ffmpeg
+# pads it back out to the full frame. The margin absorbs glyph rounding.
+BAND_MARGIN = 4
+
+# 'static' shows each caption as a plain block, 'highlight' pops the word
+# currently being spoken in a larger, brighter style
+ANIMATIONS = ('static', 'highlight')
+HIGHLIGHT_COLOR = (255, 255, 255)
+HIGHLIGHT_SCALE = 1.15
+
+# x264 settings for the H.264 outputs. Caption frames are static between
+# changes, so the 'stillimage' tune and a long GOP spend almost nothing on
+# repeated frames; burnt-in output only takes the speed preset, since its
+# frames are the source footage.
+ENCODER_PRESETS = {
+    'default': {},
+    'stillimage': {'preset': 'veryfast', 'tune': 'stillimage', 'gop_seconds': 10},
+    'fast': {'preset': 'ultrafast', 'tune': 'stillimage', 'gop_seconds': 10},
+}
+
+# Containers for the 'incremental' render mode: fragmented MP4 or an HLS
+# playlist of MPEG-TS segments, both playable while they are still growing.
+# Keyframes every LIVE_FRAGMENT_SECONDS let fragments close that often.
+# Audio is transcribed in windows of LIVE_WINDOW_SECONDS by default; the
+# first captions can only come out once the first window has been read.
+LIVE_FORMATS = ('fmp4', 'hls')
+LIVE_FRAGMENT_SECONDS = 2
+LIVE_WINDOW_SECONDS = 10
+
+# Alpha-capable encoders for the 'alpha' output mode
+ALPHA_CODECS = {
+    'png': ('.mov', {'vcodec': 'png', 'pix_fmt': 'rgba'}),
+    'prores': ('.mov', {'vcodec': 'prores_ks', 'profile:v': '4444', 'pix_fmt': 'yuva444p10le'}),
+    'vp9': ('.webm', {'vcodec': 'libvpx-vp9', 'pix_fmt': 'yuva420p', 'crf': 30, 'b:v': 0}),
+}
+
+# Every ffmpeg run logs errors only, so a failure's stderr is the error
+# itself rather than the build banner and stream listings
+FFMPEG_COMMAND = ['ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error']
+
+def ass_timestamp(seconds):
+    # ASS times are H:MM:SS.cc
+    centiseconds = max(0, round(seconds * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    secs, centiseconds = divmod(centiseconds, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centiseconds:02d}"
+
+def ass_escape(text):
+    # Braces start override blocks and backslashes start tags in ASS
+    return text.replace('\\', '/').replace('{', '(').replace('}', ')').replace('\n', ' ')
+
+def normalize_fps(fps):
+    # moviepy reports NTSC rates rounded (29.97); snap them to the exact
+    # 1000/1001 rates so long outputs do not drift against the source
+    for base in (24, 30, 48, 60, 120):
+        ntsc = base * 1000 / 1001
+        if abs(fps - ntsc) < 0.01:
+            return ntsc
+    return fps
+
+def font_size_for(width, height):
+    return max(1, round(BASE_FONT_SIZE * min(width, height) / 1080))
+
+def split_runs(runs, pieces):
+    # Cuts caption runs into at most `pieces` consecutive groups of about
+    # equal frame count. Cuts only fall between runs, i.e. on caption changes.
+    total_frames = sum(run[-1] for run in runs)
+    groups = []
+    current = []
+    done = 0
+    for run in runs:
+        current.append(run)
+        done += run[-1]
+        if len(groups) < pieces - 1 and done >= total_frames * (len(groups) + 1) / pieces:
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+def output_path_for(video_path, output_mode='greenscreen', alpha_codec='png', output_dir=None,
+                    live_format=None):
+    # live_format is set for the 'incremental' render mode, whose output
+    # has to be a fragmented MP4 or an HLS playlist whatever the source is
+    base, extension = os.path.splitext(video_path)
+    if output_mode == 'burnin':
+        path = base + "_captioned" + extension
+    elif output_mode == 'alpha':
+        path = base + "_captions" + ALPHA_CODECS[alpha_codec][0]
+    else:
+        path = base + "_greenscreen.mp4"
+    if live_format == 'fmp4':
+        path = os.path.splitext(path)[0] + ".mp4"
+    elif live_format == 'hls':
+        path = os.path.splitext(path)[0] + ".m3u8"
+    if output_dir:
+        path = os.path.join(os.path.abspath(output_dir), os.path.basename(path))
+    return os.path.normpath(path)
+
+def frame_energy(audio, frame_size, block_frames=65536):
+    # Mean square of every whole frame of frame_size samples. Works through
+    # the audio a block of frames at a time, so a long memory-mapped track
+    # never needs a full-length temporary.
+    frame_count = len(audio) // frame_size
+    energy = np.empty(frame_count, dtype=np.float32)
+    for first in range(0, frame_count, block_frames):
+        last = min(first + block_frames, frame_count)
+        block = audio[first * frame_size:last * frame_size].reshape(last - first, frame_size)
+        energy[first:last] = np.mean(np.square(block, dtype=np.float32), axis=1)
+    return energy
+
+class TimedWord:
+    # One spoken word. Slots instead of a per-word dict, and interned text
+    # (a transcript reuses a small vocabulary), keep hours of word
+    # timestamps compact. Text is stored without Whisper's leading space.
+    __slots__ = ('text', 'start', 'end')
+
+    def __init__(self, text, start, end):
+        self.text = sys.intern(text.strip())
+        self.start = float(start)
+        self.end = float(end)
+
+    def to_dict(self):
+        return {'text': self.text, 'start': self.start, 'end': self.end}
+
+class TranscriptSegment:
+    # A transcribed segment, or a caption chunk cut from one, with its
+    # TimedWords. Caption chunks share the word objects of their segment.
+    __slots__ = ('text', 'start', 'end', 'words')
+
+    def __init__(self, text, start, end, words=()):
+        self.text = text
+        self.start = float(start)
+        self.end = float(end)
+        self.words = tuple(words)
+
+    def to_dict(self):
+        return {'text': self.text, 'start': self.start, 'end': self.end,
+                'words': [word.to_dict() for word in self.words]}
+
+    @classmethod
+    def from_dict(cls, data):
+        words = [TimedWord(word['text'], word['start'], word['end']) for word in data.get('words', [])]
+        return cls(data.get('text', ''), data['start'], data['end'], words)
+
+class CaptionTimeline:
+    # Interval index over caption chunks. The chunks' start and end times are
+    # swept once into sorted change points, each holding the set of captions
+    # visible until the next change point, so a lookup is a binary search and
+    # walking frames in order costs amortised constant time per frame.
+    def __init__(self, segments):
+        self.segments = sorted(segments, key=lambda x: x.start)
+
+        events = []
+        for index, segment in enumerate(self.segments):
+            if segment.end < segment.start:
+                continue
+            events.append((segment.start, 1, index))
+            # Captions stay visible up to and including their end time
+            events.append((math.nextafter(segment.end, math.inf), 0, index))
+        events.sort(key=lambda x: x[0])
+
+        self.times = []
+        self.states = []
+        self.texts = []
+        active = set()
+        i = 0
+        while i < len(events):
+            change_time = events[i][0]
+            while i < len(events) and events[i][0] == change_time:
+                _, is_start, index = events[i]
+                if is_start:
+                    active.add(index)
+                else:
+                    active.discard(index)
+                i += 1
+
+            state = tuple(sorted(active))
+            self.times.append(change_time)
+            self.states.append(state)
+            self.texts.append(' '.join(self.segments[index].text for index in state).strip())
+
+    def state_index_at(self, time_point):
+        return bisect.bisect_right(self.times, time_point) - 1
+
+    def visible_at(self, time_point):
+        # Caption chunks visible at the given time, in start order
+        index = self.state_index_at(time_point)
+        if index < 0:
+            return []
+        return [self.segments[i] for i in self.states[index]]
+
+    def text_at(self, time_point):
+        index = self.state_index_at(time_point)
+        return self.texts[index] if index >= 0 else ""
+
+    def states_between(self, start_time, end_time):
+        # (time, text) for every caption state visible within [start_time, end_time]
+        states = []
+        first = self.state_index_at(start_time)
+        if first < 0:
+            states.append((start_time, ""))
+            first = 0
+        for index in range(first, self.state_index_at(end_time) + 1):
+            states.append((max(self.times[index], start_time), self.texts[index]))
+        return states
+
+    @staticmethod
+    def first_frame_at(time_point, fps):
+        # Smallest frame number whose timestamp is not before time_point
+        frame = max(0, math.ceil(time_point * fps))
+        while frame > 0 and (frame - 1) / fps >= time_point:
+            frame -= 1
+        while frame / fps < time_point:
+            frame += 1
+        return frame
+
+    def frame_runs(self, fps, total_frames, start_frame=0):
+        # Distinct caption states as (text, start_frame, frame_count) for
+        # frames start_frame up to total_frames, consecutive identical frames
+        # collapsed into a single run
+        runs = []
+        if total_frames <= start_frame:
+            return runs
+
+        def close_run(text, start, end):
+            if end <= start:
+                return
+            if runs and runs[-1][0] == text:
+                runs[-1] = (text, runs[-1][1], runs[-1][2] + end - start)
+            else:
+                runs.append((text, start, end - start))
+
+        current_text = self.text_at(start_frame / fps)
+        run_start = start_frame
+        for index in range(bisect.bisect_right(self.times, start_frame / fps), len(self.times)):
+            frame = self.first_frame_at(self.times[index], fps)
+            if frame >= total_frames:
+                break
+            if self.texts[index] != current_text:
+                close_run(current_text, run_start, frame)
+                current_text = self.texts[index]
+                run_start = frame
+        close_run(current_text, run_start, total_frames)
+        return runs
+
+    def active_word(self, state_index, time_point):
+        # Index, within the state's joined text, of the word being spoken at
+        # time_point, or -1. A word stays active until the next word of its
+        # caption starts.
+        active = -1
+        offset = 0
+        for segment_index in self.states[state_index]:
+            segment = self.segments[segment_index]
+            words = segment.words
+            for i, word in enumerate(words):
+                word_end = words[i + 1].start if i + 1 < len(words) else word.end
+                if word.start <= time_point < max(word_end, word.start):
+                    active = offset + i
+            offset += len(segment.text.split())
+        return active
+
+    def word_runs(self, fps, total_frames, start_frame=0):
+        # Like frame_runs, but as (text, active_word, start_frame, frame_count)
+        # so runs also change whenever the spoken word changes. The change
+        # point pointer only moves forward, so each frame costs amortised
+        # constant time.
+        runs = []
+        index = self.state_index_at(start_frame / fps) if start_frame > 0 else -1
+        for frame in range(start_frame, total_frames):
+            time_point = frame / fps
+            while index + 1 < len(self.times) and self.times[index + 1] <= time_point:
+                index += 1
+            if index < 0 or not self.texts[index]:
+                state = ("", -1)
+            else:
+                state = (self.texts[index], self.active_word(index, time_point))
+
+            if runs and runs[-1][0] == state[0] and runs[-1][1] == state[1]:
+                runs[-1][3] += 1
+            else:
+                runs.append([state[0], state[1], frame, 1])
+        return [tuple(run) for run in runs]
+
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return self.items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+class CaptionLayout:
+    # Loads each font/size once and memoises word widths, line wraps, line
+    # metrics and fully rendered caption images, so repeated phrases and
+    # repeated caption states are only laid out and drawn once
+    def __init__(self, max_rendered=64, max_wraps=4096):
+        self.fonts = {}
+        self.word_widths = {}
+        self.line_metrics_cache = {}
+        self.wraps = LRUCache(max_wraps)
+        self.rendered = LRUCache(max_rendered)
+
+    def get_font(self, font_path, size):
+        key = (font_path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            try:
+                font = ImageFont.truetype(font_path, size)
+            except (IOError, TypeError, AttributeError):
+                # Pillow 10.1+ bundles a scalable default font
+                try:
+                    font = ImageFont.load_default(size)
+                except TypeError:
+                    font = ImageFont.load_default()
+            self.fonts[key] = font
+        return font
+
+    def word_width(self, font_path, size, word):
+        key = (font_path, size, word)
+        width = self.word_widths.get(key)
+        if width is None:
+            width = self.get_font(font_path, size).getlength(word)
+            self.word_widths[key] = width
+        return width
+
+    def line_metrics(self, font_path, size, line):
+        # (width, height) of a laid out line
+        key = (font_path, size, line)
+        metrics = self.line_metrics_cache.get(key)
+        if metrics is None:
+            font = self.get_font(font_path, size)
+            bbox = font.getbbox(line)
+            metrics = (font.getlength(line), bbox[3] - bbox[1])
+            self.line_metrics_cache[key] = metrics
+        return metrics
+
+    def wrap(self, text, font_path, size, max_width):
+        key = (text, font_path, size, max_width)
+        lines = self.wraps.get(key)
+        if lines is not None:
+            return lines
+
+        # Greedy wrap on cached word widths; a line's width grows by one
+        # space and one word at a time instead of re-measuring the line
+        space_width = self.word_width(font_path, size, ' ')
+        lines = []
+        current_line = []
+        current_width = 0
+        for word in text.split():
+            word_width = self.word_width(font_path, size, word)
+            test_width = current_width + space_width + word_width if current_line else word_width
+            if test_width <= max_width:
+                current_line.append(word)
+                current_width = test_width
+            else:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+                current_width = word_width
+        lines.append(' '.join(current_line))
+
+        lines = tuple(lines)
+        self.wraps.put(key, lines)
+        return lines
+
+    def render(self, text, font_path, size, width, height, background=GREEN_SCREEN_COLOR, band=None):
+        # A background of None renders the caption on a transparent RGBA
+        # canvas. The caption is laid out on a width x height frame; band
+        # (x0, y0, x1, y1) limits the image to that part of the frame.
+        band = band or (0, 0, width, height)
+        key = (text, font_path, size, width, height, background, band)
+        img = self.rendered.get(key)
+        if img is not None:
+            return img
+
+        # Create a new frame with the current text state
+        band_size = (band[2] - band[0], band[3] - band[1])
+        if background is None:
+            img = Image.new('RGBA', band_size, color=(0, 0, 0, 0))
+        else:
+            img = Image.new('RGB', band_size, color=background)
+        draw = ImageDraw.Draw(img)
+        font = self.get_font(font_path, size)
+
+        # Draw lines
+        for line, x, y in self.place_lines(text, font_path, size, width, height):
+            draw.text((x - band[0], y - band[1]), line, fill=(0, 0, 0), font=font)
+
+        self.rendered.put(key, img)
+        return img
+
+    def place_lines(self, text, font_path, size, width, height):
+        # (line, x, y) for every wrapped line, centred on the canvas
+        lines = self.wrap(text, font_path, size, width - 100)
+        metrics = [self.line_metrics(font_path, size, line) for line in lines]
+
+        # Calculate positions
+        total_height = sum(line_height for _, line_height in metrics)
+        y = (height - total_height) // 2
+
+        placed = []
+        for line, (text_width, line_height) in zip(lines, metrics):
+            x = (width - text_width) // 2
+            placed.append((line, x, y))
+            y += line_height + 10
+        return placed
+
+    def place_words(self, text, font_path, size, width, height, highlight_size=None):
+        # (word, x, y) for every word, following the wrapped line layout.
+        # With highlight_size, every word gets a slot as wide as the word
+        # drawn at that size and sits centred in it, so whichever word is
+        # enlarged never runs into its neighbours and no word moves when
+        # the highlight does.
+        if highlight_size is None:
+            placed = []
+            for line, x, y in self.place_lines(text, font_path, size, width, height):
+                words = line.split()
+                for i, word in enumerate(words):
+                    prefix = ' '.join(words[:i]) + ' ' if i else ''
+                    placed.append((word, x + self.line_metrics(font_path, size, prefix)[0], y))
+            return placed
+
+        # Greedy wrap on the slot widths, as wrap does on word widths
+        space_width = self.word_width(font_path, size, ' ')
+        max_width = width - 100
+        lines = []
+        current_line = []
+        current_width = 0
+        for word in text.split():
+            slot_width = max(self.word_width(font_path, highlight_size, word),
+                             self.word_width(font_path, size, word))
+            test_width = current_width + space_width + slot_width if current_line else slot_width
+            if test_width <= max_width or not current_line:
+                current_line.append((word, slot_width))
+                current_width = test_width
+            else:
+                lines.append((current_line, current_width))
+                current_line = [(word, slot_width)]
+                current_width = slot_width
+        lines.append((current_line, current_width))
+
+        metrics = [self.line_metrics(font_path, size, ' '.join(word for word, _ in line))
+                   for line, _ in lines]
+        y = (height - sum(line_height for _, line_height in metrics)) // 2
+        placed = []
+        for (line, line_width), (_, line_height) in zip(lines, metrics):
+            x = (width - line_width) // 2
+            for word, slot_width in line:
+                placed.append((word, x + (slot_width - self.word_width(font_path, size, word)) / 2, y))
+                x += slot_width + space_width
+            y += line_height + 10
+        return placed
+
+    def text_bounds(self, text, font_path, size, width, height, highlight_size=None):
+        # (x0, y0, x1, y1) covered by the caption's glyphs, or None when it
+        # draws nothing. With highlight_size, the caption is measured in the
+        # highlight word layout, every word also enlarged to that size around
+        # its centre, as the highlight draws it.
+        font = self.get_font(font_path, size)
+        rects = []
+        if highlight_size is None:
+            for line, x, y in self.place_lines(text, font_path, size, width, height):
+                left, top, right, bottom = font.getbbox(line)
+                if right > left and bottom > top:
+                    rects.append((x + left, y + top, x + right, y + bottom))
+        else:
+            large_font = self.get_font(font_path, highlight_size)
+            for word, x, y in self.place_words(text, font_path, size, width, height, highlight_size):
+                left, top, right, bottom = font.getbbox(word)
+                if right <= left or bottom <= top:
+                    continue
+                # Word masks are drawn at whole pixels
+                x, y = int(round(x)), int(round(y))
+                rects.append((x + left, y + top, x + right, y + bottom))
+                large_left, large_top, large_right, large_bottom = large_font.getbbox(word)
+                if large_right <= large_left:
+                    continue
+                center_x = x + (left + right) / 2
+                center_y = y + (top + bottom) / 2
+                half_width = (large_right - large_left) / 2
+                half_height = (large_bottom - large_top) / 2
+                rects.append((center_x - half_width, center_y - half_height,
+                              center_x + half_width, center_y + half_height))
+
+        if not rects:
+            return None
+        return (math.floor(min(rect[0] for rect in rects)), math.floor(min(rect[1] for rect in rects)),
+                math.ceil(max(rect[2] for rect in rects)), math.ceil(max(rect[3] for rect in rects)))
+
+    def render_word_mask(self, word, font_path, size, x=0, y=0):
+        # Coverage mask of a single word drawn at (x, y), cropped to the
+        # glyphs; returns (x, y, mask) or None when nothing is drawn
+        font = self.get_font(font_path, size)
+        left, top, right, bottom = font.getbbox(word)
+        if right <= left or bottom <= top:
+            return None
+        img = Image.new('L', (right - left, bottom - top), color=0)
+        ImageDraw.Draw(img).text((-left, -top), word, fill=255, font=font)
+        return int(round(x)) + left, int(round(y)) + top, np.asarray(img)
+
+    def render_mask(self, text, font_path, size, width, height, band=None):
+        # Rasterise a caption once into an 8-bit coverage mask cropped to
+        # its bounding box; returns (x, y, mask) or None for empty captions.
+        # Coordinates are relative to band when one is given.
+        band = band or (0, 0, width, height)
+        img = Image.new('L', (band[2] - band[0], band[3] - band[1]), color=0)
+        draw = ImageDraw.Draw(img)
+        font = self.get_font(font_path, size)
+        for line, x, y in self.place_lines(text, font_path, size, width, height):
+            draw.text((x - band[0], y - band[1]), line, fill=255, font=font)
+
+        bbox = img.getbbox()
+        if bbox is None:
+            return None
+        return bbox[0], bbox[1], np.asarray(img.crop(bbox))
+
+# Shared across jobs so fonts and layouts survive between runs
+caption_layout = CaptionLayout()
+
+class FrameCompositor:
+    # Composes caption frames into a small pool of preallocated NumPy frame
+    # buffers. Each caption is rasterised once to a coverage mask and blended
+    # onto the background with vectorised NumPy; a buffer only has the area
+    # of its previous caption restored before the next one is blended in, so
+    # no frame-sized memory is allocated per frame.
+    #
+    # Highlighted captions are laid out per word. Each buffer remembers which
+    # caption and active word it holds, so when only the active word moves
+    # just the old and new highlight rectangles are redrawn.
+    def __init__(self, width, height, font_path, font_size, background=GREEN_SCREEN_COLOR,
+                 text_color=(0, 0, 0), pool_size=3, max_masks=64,
+                 highlight_color=HIGHLIGHT_COLOR, highlight_scale=HIGHLIGHT_SCALE, band=None):
+        # Captions are laid out on the full width x height frame, but the
+        # buffers only hold band (x0, y0, x1, y1) and every position below
+        # is relative to it
+        self.layout_size = (width, height)
+        self.band = band or (0, 0, width, height)
+        self.width = self.band[2] - self.band[0]
+        self.height = self.band[3] - self.band[1]
+        self.font_path = font_path
+        self.font_size = font_size
+        self.transparent = background is None
+        channels = 4 if self.transparent else 3
+        self.background = np.array((0, 0, 0, 0) if self.transparent else background, dtype=np.uint8)
+        self.text_color = np.array(text_color, dtype=np.uint16)
+        self.highlight_color = np.array(highlight_color, dtype=np.uint16)
+        self.highlight_scale = highlight_scale
+        self.highlight_size = max(1, round(font_size * highlight_scale))
+        self.canvas = (0, 0, self.width, self.height)
+        self.masks = LRUCache(max_masks)
+        self.word_masks = LRUCache(max_masks)
+        self.sprites = LRUCache(max_masks * 4)
+
+        self.free = queue.Queue()
+        self.buffers = []
+        for _ in range(pool_size):
+            buffer = np.empty((self.height, self.width, channels), dtype=np.uint8)
+            buffer[:] = self.background
+            self.buffers.append({
+                'frame': buffer,
+                'view': memoryview(buffer).cast('B'),
+                'region': None,
+                'caption': None,
+                'active': None,
+                'sprite_rect': None,
+            })
+            self.free.put(len(self.buffers) - 1)
+
+    @property
+    def pix_fmt(self):
+        return 'rgba' if self.transparent else 'rgb24'
+
+    def caption_mask(self, text):
+        mask = self.masks.get(text)
+        if mask is None:
+            mask = caption_layout.render_mask(text, self.font_path, self.font_size, *self.layout_size,
+                                              band=self.band)
+            # Empty captions are cached as a falsy placeholder
+            self.masks.put(text, mask or ())
+        return mask or None
+
+    def caption_words(self, text):
+        # Per-word masks of a caption, None for words that draw nothing
+        words = self.word_masks.get(text)
+        if words is None:
+            x0, y0 = self.band[:2]
+            words = [caption_layout.render_word_mask(word, self.font_path, self.font_size, x - x0, y - y0)
+                     for word, x, y in caption_layout.place_words(text, self.font_path, self.font_size,
+                                                                  *self.layout_size, self.highlight_size)]
+            self.word_masks.put(text, words)
+        return words
+
+    def highlight_sprite(self, text, index):
+        # The active word drawn larger and centred on its normal position
+        key = (text, index)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            words = self.caption_words(text)
+            base = words[index] if 0 <= index < len(words) else None
+            if base is not None:
+                x, y, mask = base
+                center_x = x + mask.shape[1] / 2
+                center_y = y + mask.shape[0] / 2
+                word = text.split()[index]
+                sprite = caption_layout.render_word_mask(word, self.font_path, self.highlight_size)
+                if sprite is not None:
+                    _, _, sprite_mask = sprite
+                    sprite = (int(round(center_x - sprite_mask.shape[1] / 2)),
+                              int(round(center_y - sprite_mask.shape[0] / 2)), sprite_mask)
+            self.sprites.put(key, sprite or ())
+        return sprite or None
+
+    @staticmethod
+    def rect_of(placed):
+        x, y, mask = placed
+        return x, y, x + mask.shape[1], y + mask.shape[0]
+
+    @staticmethod
+    def union(a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+    def clip(self, rect):
+        x0, y0 = max(rect[0], 0), max(rect[1], 0)
+        x1, y1 = min(rect[2], self.width), min(rect[3], self.height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def blend(self, frame, placed, color, clip):
+        # Blend a coverage mask in the given colour onto the frame, limited
+        # to the clip rectangle
+        x, y, coverage = placed
+        rect = self.clip((max(x, clip[0]), max(y, clip[1]),
+                          min(x + coverage.shape[1], clip[2]), min(y + coverage.shape[0], clip[3])))
+        if rect is None:
+            return
+        x0, y0, x1, y1 = rect
+        alpha = coverage[y0 - y:y1 - y, x0 - x:x1 - x]
+        region = frame[y0:y1, x0:x1]
+        if self.transparent:
+            # Straight-alpha "over" compositing
+            source_alpha = alpha.astype(np.float32) / 255
+            dest_alpha = region[..., 3].astype(np.float32) / 255 * (1 - source_alpha)
+            out_alpha = source_alpha + dest_alpha
+            rgb = (color * source_alpha[..., None] + region[..., :3] * dest_alpha[..., None]) \
+                / np.maximum(out_alpha, 1e-6)[..., None]
+            region[..., :3] = rgb + 0.5
+            region[..., 3] = out_alpha * 255 + 0.5
+        else:
+            alpha = alpha[..., None].astype(np.uint16)
+            region[:] = (region * (255 - alpha) + color * alpha + 127) // 255
+
+    def fill(self, frame, rect):
+        rect = self.clip(rect)
+        if rect is not None:
+            x0, y0, x1, y1 = rect
+            frame[y0:y1, x0:x1] = self.background
+
+    def redraw(self, frame, words, active, sprite, rect):
+        # Redraw one rectangle of a highlighted caption from its layers
+        rect = self.clip(rect)
+        if rect is None:
+            return
+        self.fill(frame, rect)
+        for index, placed in enumerate(words):
+            if placed is not None and index != active:
+                self.blend(frame, placed, self.text_color, rect)
+        if sprite is not None:
+            self.blend(frame, sprite, self.highlight_color, rect)
+
+    def compose(self, text, active=None):
+        # Returns the index of a pool buffer holding the caption frame;
+        # blocks until the encoder has released a buffer. active is the index
+        # of the highlighted word, or None for a static caption.
+        index = self.free.get()
+        entry = self.buffers[index]
+        frame = entry['frame']
+
+        if active is not None:
+            self.compose_highlight(entry, text, active)
+            return index
+
+        # Restore only the area the previous caption covered
+        if entry['region'] is not None:
+            self.fill(frame, entry['region'])
+            entry['region'] = None
+        entry['caption'] = entry['active'] = entry['sprite_rect'] = None
+
+        mask = self.caption_mask(text)
+        if mask is not None:
+            self.blend(frame, mask, self.text_color, self.canvas)
+            entry['region'] = self.rect_of(mask)
+        return index
+
+    def compose_highlight(self, entry, text, active):
+        frame = entry['frame']
+        words = self.caption_words(text)
+        sprite = self.highlight_sprite(text, active) if active >= 0 else None
+        sprite_rect = self.rect_of(sprite) if sprite is not None else None
+
+        if entry['caption'] == text:
+            # Same caption: only the old and new highlight rectangles are dirty
+            if entry['active'] != active:
+                for dirty in (entry['sprite_rect'], sprite_rect):
+                    if dirty is not None:
+                        self.redraw(frame, words, active, sprite, dirty)
+        else:
+            if entry['region'] is not None:
+                self.fill(frame, entry['region'])
+            region = None
+            for word_index, placed in enumerate(words):
+                if placed is not None:
+                    region = self.union(region, self.rect_of(placed))
+                    if word_index != active:
+                        self.blend(frame, placed, self.text_color, self.canvas)
+            if sprite is not None:
+                self.blend(frame, sprite, self.highlight_color, self.canvas)
+            entry['region'] = region
+
+        entry['region'] = self.union(entry['region'], sprite_rect)
+        entry['caption'] = text
+        entry['active'] = active
+        entry['sprite_rect'] = sprite_rect
+
+    def frame(self, index):
+        return self.buffers[index]['frame']
+
+    def view(self, index):
+        # Zero-copy byte view of a buffer for writing to the encoder
+        return self.buffers[index]['view']
+
+    def release(self, index):
+        self.free.put(index)
+
+WHISPER_MODELS = ('tiny', 'base', 'small', 'medium', 'large')
+WHISPER_SAMPLE_RATE = 16000
+DEFAULT_WHISPER_MODEL = 'base'
+
+class WhisperModelManager:
+    # Keeps loaded Whisper models resident for the life of the process,
+    # keyed by model name, so repeated jobs and batches share one load
+    def __init__(self):
+        self.models = {}
+        self.load_locks = {}
+        self.lock = threading.Lock()
+
+    def get(self, model_name):
+        with self.lock:
+            model = self.models.get(model_name)
+            if model is not None:
+                return model
+            load_lock = self.load_locks.setdefault(model_name, threading.Lock())
+
+        # Only one thread loads a given model; others wait for it
+        with load_lock:
+            with self.lock:
+                model = self.models.get(model_name)
+            if model is None:
+                # Whisper pulls in torch, so it is only imported once a
+                # model is actually needed
+                import whisper
+                model = whisper.load_model(model_name)
+                with self.lock:
+                    self.models[model_name] = model
+            return model
+
+    def is_loaded(self, model_name):
+        with self.lock:
+            return model_name in self.models
+
+    def prewarm(self, model_name):
+        # Load the model in the background, e.g. while files are being picked
+        def load():
+            try:
+                self.get(model_name)
+            except Exception as e:
+                print(f"Warning: Could not pre-load Whisper model {model_name}: {str(e)}", file=sys.stderr)
+
+        thread = threading.Thread(target=load, daemon=True)
+        thread.start()
+        return thread
+
+whisper_models = WhisperModelManager()
+
+def _init_transcribe_worker(model_name, torch_threads):
+    # Runs once per pool process: split the cores between workers and load
+    # the model a single time for every chunk this process handles
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    whisper_models.get(model_name)
+
+def _transcribe_chunk(model_name, audio, options):
+    if isinstance(audio, tuple):
+        # (path, start, end) of a chunk of a raw float32 file, mapped here
+        # rather than pickled across from the parent
+        path, start, end = audio
+        audio = np.memmap(path, dtype=np.float32, mode='c', offset=start * 4, shape=(end - start,))
+    result = whisper_models.get(model_name).transcribe(audio, **options)
+    if not result or 'segments' not in result:
+        raise ValueError("Transcription failed - no segments generated")
+    return result['segments']
+
+class ChunkedTranscriber:
+    # Splits long audio at its quietest points into overlapping chunks,
+    # transcribes the chunks in a process pool and stitches the segments
+    # back together with offset-corrected times. Each chunk only keeps the
+    # words that start inside its own span, which removes the duplicates
+    # produced by the overlap without losing words from segments that
+    # straddle a cut.
+    def __init__(self, model_name, workers, chunk_seconds=120, overlap_seconds=2,
+                 search_seconds=10, frame_seconds=0.03):
+        self.model_name = model_name
+        self.workers = workers
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.search_seconds = search_seconds
+        self.frame_seconds = frame_seconds
+
+    def settings(self):
+        return {
+            'chunk_seconds': self.chunk_seconds,
+            'overlap_seconds': self.overlap_seconds,
+            'search_seconds': self.search_seconds,
+        }
+
+    def should_split(self, audio, sample_rate):
+        return len(audio) > 1.5 * self.chunk_seconds * sample_rate
+
+    def find_cuts(self, audio, sample_rate):
+        # Sample offsets to split at, each at the lowest-energy frame
+        # within search_seconds of the nominal chunk boundary
+        frame_size = max(1, int(self.frame_seconds * sample_rate))
+        frame_count = len(audio) // frame_size
+        energy = np.sqrt(frame_energy(audio, frame_size))
+
+        cuts = [0]
+        chunk_frames = int(self.chunk_seconds * sample_rate) // frame_size
+        search_frames = int(self.search_seconds * sample_rate) // frame_size
+        target = chunk_frames
+        while target < frame_count - chunk_frames // 2:
+            low = max(target - search_frames, cuts[-1] // frame_size + 1)
+            high = min(target + search_frames, frame_count)
+            if high <= low:
+                break
+            quietest = low + int(np.argmin(energy[low:high]))
+            cuts.append(quietest * frame_size + frame_size // 2)
+            target = quietest + chunk_frames
+        cuts.append(len(audio))
+        return cuts
+
+    @staticmethod
+    def chunk_source(audio, start, end):
+        # What a worker gets for audio[start:end]: audio memory-mapped from a
+        # whole raw float32 file is passed as the file and sample range, so
+        # workers map their own chunk instead of receiving a pickled copy
+        if (isinstance(audio, np.memmap) and audio.filename and audio.dtype == np.float32
+                and audio.offset == 0 and os.path.getsize(audio.filename) == audio.nbytes):
+            return (audio.filename, start, end)
+        return np.ascontiguousarray(audio[start:end])
+
+    def transcribe(self, audio, sample_rate, options):
+        cuts = self.find_cuts(audio, sample_rate)
+        overlap = int(self.overlap_seconds * sample_rate)
+
+        chunks = []
+        for start, end in zip(cuts[:-1], cuts[1:]):
+            chunks.append((max(0, start - overlap), start, end, min(len(audio), end + overlap)))
+
+        torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        context = multiprocessing.get_context('spawn')
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(self.workers, len(chunks)), mp_context=context,
+                initializer=_init_transcribe_worker,
+                initargs=(self.model_name, torch_threads)) as executor:
+            futures = [executor.submit(_transcribe_chunk, self.model_name,
+                                       self.chunk_source(audio, chunk_start, chunk_end), options)
+                       for chunk_start, _, _, chunk_end in chunks]
+            results = [future.result() for future in futures]
+        return self.stitch(chunks, results, sample_rate)
+
+    def stitch(self, chunks, results, sample_rate):
+        # chunks are (chunk_start, start, end, chunk_end) sample offsets and
+        # results the Whisper segments of each chunk, timed from chunk_start.
+        # A chunk owns [start, end) of the audio; the first and last chunks
+        # also own everything before and after it.
+        segments = []
+        for index, ((chunk_start, start, end, _), chunk_segments) in enumerate(zip(chunks, results)):
+            offset = chunk_start / sample_rate
+            span_start = start / sample_rate if index > 0 else -math.inf
+            span_end = end / sample_rate if index < len(chunks) - 1 else math.inf
+            for segment in chunk_segments:
+                if 'words' not in segment:
+                    # Without word times, keep segments that begin in the span
+                    if span_start <= segment['start'] + offset < span_end:
+                        segments.append({
+                            'text': segment['text'],
+                            'start': segment['start'] + offset,
+                            'end': segment['end'] + offset,
+                        })
+                    continue
+
+                words = [
+                    {'text': word['text'], 'start': word['start'] + offset, 'end': word['end'] + offset}
+                    for word in segment['words']
+                    if span_start <= word['start'] + offset < span_end
+                ]
+                if not words:
+                    continue
+                if len(words) == len(segment['words']):
+                    stitched = {
+                        'text': segment['text'],
+                        'start': segment['start'] + offset,
+                        'end': segment['end'] + offset,
+                    }
+                else:
+                    # The segment straddles a cut: keep only this chunk's
+                    # words and rebuild the text and times from them
+                    stitched = {
+                        'text': ''.join(word['text'] for word in words),
+                        'start': words[0]['start'],
+                        'end': words[-1]['end'],
+                    }
+                stitched['words'] = words
+                segments.append(stitched)
+        return segments
+
+class AudioWindowReader:
+    # Decodes a video's audio track with ffmpeg into fixed-size windows of
+    # 16 kHz mono float32 samples as they arrive, so memory stays bounded
+    # however long the input is, and live inputs (URLs, growing files) can be
+    # captioned while they are still being read
+    def __init__(self, video_path, window_seconds=LIVE_WINDOW_SECONDS, sample_rate=WHISPER_SAMPLE_RATE):
+        self.video_path = video_path
+        self.window_seconds = window_seconds
+        self.sample_rate = sample_rate
+
+    def __iter__(self):
+        # Yields (samples, is_last) for every window
+        stream = ffmpeg.input(self.video_path)
+        stream = ffmpeg.output(stream.audio, 'pipe:', format='f32le', acodec='pcm_f32le',
+                               ac=1, ar=self.sample_rate)
+        process = ffmpeg.run_async(stream, cmd=FFMPEG_COMMAND,
+                                   pipe_stdout=True, pipe_stderr=True)
+
+        # Drain stderr so a chatty decoder can never block on a full pipe
+        stderr_chunks = []
+        stderr_thread = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()),
+                                         name="ffmpeg-stderr", daemon=True)
+        stderr_thread.start()
+
+        window_bytes = int(self.window_seconds * self.sample_rate) * 4
+        received = False
+        try:
+            while True:
+                data = process.stdout.read(window_bytes)
+                # The pipe is buffered, so a read only comes back short at
+                # the end of the stream; full windows go out straight away
+                if len(data) < window_bytes:
+                    break
+                yield np.frombuffer(data, dtype=np.float32), False
+                received = True
+        finally:
+            process.stdout.close()
+            process.wait()
+            stderr_thread.join()
+
+        if process.returncode != 0:
+            stderr = b''.join(chunk for chunk in stderr_chunks if chunk).decode(errors='replace')
+            print(f"Error extracting audio: {stderr}", file=sys.stderr)
+            if 'matches no streams' in stderr:
+                raise ValueError("No audio found in video file")
+            raise Exception(f"FFmpeg error: {stderr}")
+        if not received and len(data) < 4:
+            raise ValueError("No audio found in video file")
+        # The last window may be empty when the audio ends on a window boundary
+        yield np.frombuffer(data[:len(data) // 4 * 4], dtype=np.float32), True
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), "BeastFont_cache")
+
+class TranscriptionCache:
+    # On-disk cache of transcription_data, addressed by a hash of the decoded
+    # audio plus the model name and transcribe options. Entries are evicted
+    # least recently used first once the entry count or total size is exceeded.
+    def __init__(self, cache_dir, max_entries=256, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def make_key(self, audio, samplerate, model_name, options):
+        digest = hashlib.sha256()
+        audio = np.ascontiguousarray(audio)
+        digest.update(f"{audio.dtype.str}:{audio.shape}:{samplerate}".encode())
+        digest.update(memoryview(audio).cast('B'))
+        digest.update(json.dumps({'model': model_name, 'options': options}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load(self, key):
+        path = self.entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def store(self, key, data):
+        with self.lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                path = self.entry_path(key)
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, path)
+                self.evict()
+            except OSError as e:
+                print(f"Warning: Could not write transcription cache: {str(e)}", file=sys.stderr)
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Drop least recently used entries until both limits are met
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_bytes -= size
+
+transcription_cache = TranscriptionCache(os.path.join(CACHE_DIR, "transcripts"))
+
+class ProgressChannel:
+    # Thread-safe hand-off of job events (status, progress, done, error)
+    # from the worker thread to whatever displays them: the Tk main loop
+    # polls it with after(), headless runs follow it on a reporter thread
+    def __init__(self, source=None):
+        self.events = queue.Queue()
+        self.source = source
+
+    def publish(self, kind, **fields):
+        event = {'type': kind, 'time': round(time.time(), 3)}
+        if self.source is not None:
+            event['video'] = self.source
+        event.update(fields)
+        self.events.put(event)
+
+    def status(self, message):
+        self.publish('status', message=message)
+
+    def progress(self, progress, message=None):
+        self.publish('progress', progress=round(progress, 1), message=message)
+
+    def drain(self):
+        # Everything queued so far, without blocking
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def follow(self, handler):
+        # Blocks until the job reports that it is done or has failed
+        while True:
+            event = self.events.get()
+            handler(event)
+            if event['type'] in ('done', 'error'):
+                return
+
+def print_progress_event(event):
+    # Console reporter
+    name = os.path.basename(event.get('video') or '')
+    prefix = f"[{name}] " if name else ""
+    if event['type'] == 'progress':
+        message = event['message'] or f"{event['progress']:.1f}%"
+    elif event['type'] == 'done':
+        message = f"Done: {event['output']}"
+    elif event['type'] == 'error':
+        message = f"Error: {event['error']}"
+    else:
+        message = event['message']
+    print(prefix + message, flush=True)
+
+def print_progress_json(event):
+    # Machine-readable reporter: one JSON object per line
+    print(json.dumps(event), flush=True)
+
+PROGRESS_REPORTERS = {
+    'console': print_progress_event,
+    'json': print_progress_json,
+}
+
+# How often the GUI drains the progress channel
+PROGRESS_POLL_MS = 100
+
+class JobTracer:
+    # Timing spans and counters for one job, saved as a Chrome trace that
+    # opens in chrome://tracing or https://ui.perfetto.dev. Stage spans can
+    # also run under cProfile, one .prof file per stage.
+    def __init__(self, profile_dir=None):
+        self.profile_dir = profile_dir
+        self.events = []
+        self.counters = {}
+        self.thread_names = {}
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+
+    def now(self):
+        return (time.perf_counter() - self.origin) * 1e6
+
+    @contextlib.contextmanager
+    def span(self, name, stage=False, **args):
+        # Stage spans are the top-level pipeline steps; they are profiled
+        # when a profile directory is set and snapshot the counters
+        profiler = None
+        if stage and self.profile_dir:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = self.now()
+        try:
+            yield
+        finally:
+            end = self.now()
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+            thread = threading.current_thread()
+            with self.lock:
+                self.thread_names[thread.ident] = thread.name
+                self.events.append({'name': name, 'cat': 'stage' if stage else 'step', 'ph': 'X',
+                                    'ts': start, 'dur': end - start, 'pid': self.pid,
+                                    'tid': thread.ident, 'args': args})
+                if stage and self.counters:
+                    self.events.append({'name': 'counters', 'ph': 'C', 'ts': end, 'pid': self.pid,
+                                        'args': dict(self.counters)})
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def stage_seconds(self):
+        # Wall time per stage span, for reports
+        with self.lock:
+            return {event['name']: round(event['dur'] / 1e6, 3)
+                    for event in self.events if event.get('cat') == 'stage'}
+
+    def save(self, path, **metadata):
+        with self.lock:
+            events = [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                       'args': {'name': name}} for tid, name in self.thread_names.items()]
+            events.extend(self.events)
+            trace = {
+                'traceEvents': events,
+                'displayTimeUnit': 'ms',
+                'otherData': dict(metadata, counters=dict(self.counters)),
+            }
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        return path
+
+class CaptionJob:
+    def __init__(self, video_path, font_path, temp_dir, status_callback=None, progress_callback=None,
+                 render_mode='events', model_name=DEFAULT_WHISPER_MODEL, use_cache=True,
+                 transcribe_workers=1, output_path=None, output_mode='greenscreen', alpha_codec='png',
+                 export_subtitles=False, animation='static', trace_path=None, profile_dir=None,
+                 progress_channel=None, progress_interval=0.25, encode_workers=4,
+                 encoder_preset='default', live_format='fmp4', window_seconds=LIVE_WINDOW_SECONDS):
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode: {render_mode}")
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {output_mode}")
+        if alpha_codec not in ALPHA_CODECS:
+            raise ValueError(f"Unknown alpha codec: {alpha_codec}")
+        if render_mode == 'frames' and output_mode != 'greenscreen':
+            raise ValueError("The 'frames' render mode only supports green screen output")
+        if render_mode == 'segments' and output_mode == 'burnin':
+            raise ValueError("The 'segments' render mode does not support burn-in output")
+        if render_mode == 'incremental' and output_mode == 'alpha':
+            raise ValueError("The 'incremental' render mode does not support alpha output")
+        if live_format not in LIVE_FORMATS:
+            raise ValueError(f"Unknown live format: {live_format}")
+        if encoder_preset not in ENCODER_PRESETS:
+            raise ValueError(f"Unknown encoder preset: {encoder_preset}")
+        if animation not in ANIMATIONS:
+            raise ValueError(f"Unknown animation: {animation}")
+        if render_mode == 'frames' and animation != 'static':
+            raise ValueError("The 'frames' render mode only supports static captions")
+        if render_mode == 'ass' and animation != 'static':
+            # libass draws the karaoke colouring from the word timings, but
+            # not the enlarged active word
+            raise ValueError("The 'ass' render mode only supports static captions")
+
+        self.video_path = video_path
+        self.font_path = font_path
+        self.temp_dir = temp_dir
+        self.work_dir = temp_dir
+        self.output_path = output_path
+        self.output_mode = output_mode
+        self.alpha_codec = alpha_codec
+        self.export_subtitles = export_subtitles
+        self.animation = animation
+        self.render_mode = render_mode
+        self.encode_workers = encode_workers
+        self.encoder_preset = encoder_preset
+        self.live_format = live_format
+        self.window_seconds = window_seconds
+        self.model_name = model_name
+        self.transcribe_options = {'word_timestamps': True}
+        self.transcription_cache = transcription_cache if use_cache else None
+        self.transcribe_workers = transcribe_workers
+        self.chunked_transcriber = None
+        if transcribe_workers > 1:
+            self.chunked_transcriber = ChunkedTranscriber(model_name, transcribe_workers)
+        self.status_callback = status_callback
+        self.progress_callback = progress_callback
+        self.progress_channel = progress_channel
+        self.progress_interval = progress_interval
+        self.last_progress_report = None
+        self.font_size = BASE_FONT_SIZE
+        self.transcribed_text = None
+        self.timeline = None
+        self.source = None
+        self.trace_path = trace_path
+        self.tracer = JobTracer(profile_dir)
+
+    def cache_options(self, audio, sample_rate=WHISPER_SAMPLE_RATE):
+        # Chunked transcripts differ slightly from single-pass ones, so the
+        # chunking settings are part of the cache key when the audio is split
+        options = dict(self.transcribe_options)
+        if self.chunked_transcriber is not None and self.chunked_transcriber.should_split(audio, sample_rate):
+            options['chunking'] = self.chunked_transcriber.settings()
+        return options
+
+    def update_status(self, message):
+        if self.progress_channel is not None:
+            self.progress_channel.status(message)
+        elif self.status_callback is not None:
+            self.status_callback(message)
+        else:
+            print(message, file=sys.stderr)
+
+    def update_progress(self, progress):
+        if self.progress_channel is not None:
+            self.progress_channel.progress(progress)
+        elif self.progress_callback is not None:
+            self.progress_callback(progress)
+
+    def report_progress(self, progress, message):
+        # Called once per frame or caption state; updates are throttled to a
+        # few per second so the render loop never waits on the display
+        now = time.monotonic()
+        if (progress < 100 and self.last_progress_report is not None
+                and now - self.last_progress_report < self.progress_interval):
+            return
+        self.last_progress_report = now
+        if self.progress_channel is not None:
+            self.progress_channel.progress(progress, message)
+        else:
+            self.update_progress(progress)
+            self.update_status(message)
+
+    def default_output_path(self):
+        live_format = self.live_format if self.render_mode == 'incremental' else None
+        return output_path_for(self.video_path, self.output_mode, self.alpha_codec,
+                               live_format=live_format)
+
+    def caption_background(self):
+        # Only the green screen output needs an opaque background
+        return GREEN_SCREEN_COLOR if self.output_mode == 'greenscreen' else None
+
+    def source_info(self):
+        # (width, height, fps) of the source video, probed once per job; the
+        # caption video matches it so it lines up with the footage without
+        # re-timing or scaling, and the font is scaled to the canvas
+        if self.source is None:
+            if self.video_path is None:
+                self.source = (*DEFAULT_CANVAS_SIZE, DEFAULT_FPS)
+            else:
+                # moviepy is slow to import, so it loads on first use
+                import moviepy.editor
+                clip = moviepy.editor.VideoFileClip(self.video_path)
+                try:
+                    width, height = clip.size
+                    fps = normalize_fps(clip.fps) if clip.fps else DEFAULT_FPS
+                finally:
+                    clip.close()
+                self.source = (int(width), int(height), fps)
+            self.font_size = font_size_for(*self.source[:2])
+        return self.source
+
+    def canvas_size(self):
+        return self.source_info()[:2]
+
+    def frame_rate(self):
+        return self.source_info()[2]
+
+    def caption_band(self, width, height, fps):
+        # Smallest rectangle holding every caption state of the timeline,
+        # including highlighted words, in frame coordinates. Only this band
+        # is rendered; build_output pads it back into the full frame.
+        highlight_size = None
+        if self.animation == 'highlight':
+            highlight_size = max(1, round(self.font_size * HIGHLIGHT_SCALE))
+        band = None
+        for text, _, _ in self.caption_states(fps):
+            bounds = caption_layout.text_bounds(text, self.font_path, self.font_size, width, height,
+                                                highlight_size)
+            band = FrameCompositor.union(band, bounds)
+        if band is None:
+            return 0, 0, min(2, width), min(2, height)
+
+        # Even offsets and sizes keep chroma-subsampled outputs aligned
+        x0 = max(0, band[0] - BAND_MARGIN) // 2 * 2
+        y0 = max(0, band[1] - BAND_MARGIN) // 2 * 2
+        x1 = min(width, (band[2] + BAND_MARGIN + 1) // 2 * 2)
+        y1 = min(height, (band[3] + BAND_MARGIN + 1) // 2 * 2)
+        return x0, y0, x1, y1
+
+    def x264_options(self):
+        # ffmpeg output arguments for the selected encoder preset
+        preset = ENCODER_PRESETS[self.encoder_preset]
+        options = {'vcodec': 'libx264', 'pix_fmt': 'yuv420p'}
+        if 'preset' in preset:
+            options['preset'] = preset['preset']
+        if self.output_mode != 'burnin':
+            if 'tune' in preset:
+                options['tune'] = preset['tune']
+            if 'gop_seconds' in preset:
+                options['g'] = max(1, round(preset['gop_seconds'] * self.frame_rate()))
+        if self.render_mode == 'incremental':
+            options['g'] = max(1, round(LIVE_FRAGMENT_SECONDS * self.frame_rate()))
+        return options
+
+    def container_options(self, output_path):
+        # Muxer arguments; only the 'incremental' render mode needs any
+        if self.render_mode != 'incremental':
+            return {}
+        if self.live_format == 'hls':
+            return {
+                'format': 'hls',
+                'hls_time': LIVE_FRAGMENT_SECONDS,
+                'hls_list_size': 0,
+                'hls_playlist_type': 'event',
+                'hls_segment_filename': os.path.splitext(output_path)[0] + "_%05d.ts",
+            }
+        return {'movflags': 'frag_keyframe+empty_moov+default_base_moof'}
+
+    def build_output(self, captions, output_path, total_frames, band=None):
+        # Turns the caption video stream into the ffmpeg output for the
+        # selected output mode. band is where the caption stream sits in the
+        # frame when it does not cover all of it.
+        width, height = self.canvas_size()
+        x0, y0 = band[:2] if band is not None else (0, 0)
+        if self.output_mode == 'burnin':
+            # Overlay onto the source in the same decode/encode pass; the
+            # source keeps playing after the last caption and its audio is
+            # copied unchanged
+            source = ffmpeg.input(self.video_path)
+            video = ffmpeg.filter([source.video, captions], 'overlay', x=x0, y=y0, eof_action='pass')
+            return ffmpeg.output(video, source.audio, output_path, acodec='copy', **self.x264_options(),
+                                 **self.container_options(output_path))
+        if band is not None and band != (0, 0, width, height):
+            color = 'black@0.0' if self.output_mode == 'alpha' else '0x%02X%02X%02X' % GREEN_SCREEN_COLOR
+            captions = captions.filter('pad', width, height, x0, y0, color=color)
+        if self.output_mode == 'alpha':
+            return ffmpeg.output(captions, output_path, vframes=total_frames,
+                                 **ALPHA_CODECS[self.alpha_codec][1])
+        options = dict(self.x264_options(), **self.container_options(output_path))
+        # The length of an incremental output is not known up front
+        if total_frames is not None:
+            options['vframes'] = total_frames
+        return ffmpeg.output(captions, output_path, **options)
+
+    def run(self):
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+        # Every run gets its own scratch directory, so concurrent jobs never
+        # share temporary files
+        self.work_dir = tempfile.mkdtemp(prefix="job_", dir=self.temp_dir)
+        preview_extension = ".jpg" if self.output_mode == 'greenscreen' else ".png"
+        temp_image = os.path.join(self.work_dir, "temp_greenscreen" + preview_extension)
+        tracer = self.tracer
+        layout_hits = caption_layout.rendered.hits
+        layout_misses = caption_layout.rendered.misses
+
+        try:
+            # The incremental mode reads and transcribes the audio itself,
+            # window by window, while it renders
+            if self.render_mode != 'incremental':
+                with tracer.span('extract_audio', stage=True):
+                    self.update_status("Extracting audio from video...")
+                    audio = self.extract_audio(self.video_path)
+
+                with tracer.span('transcribe', stage=True, model=self.model_name):
+                    self.update_status("Transcribing audio...")
+                    self.transcribed_text = self.transcribe_audio(audio)
+                # Release the mapped audio file before the scratch directory goes
+                audio = None
+
+            output_path = self.output_path or self.default_output_path()
+            fps = self.frame_rate()
+
+            # Render the caption timeline once; the preview image and the
+            # final video are both taken from the same frames
+            with tracer.span('render_encode', stage=True, render_mode=self.render_mode,
+                             output_mode=self.output_mode, fps=fps):
+                if self.render_mode == 'incremental':
+                    self.update_status("Captioning incrementally...")
+                    self.encode_incremental(output_path, temp_image, fps)
+                elif self.render_mode == 'events':
+                    self.update_status("Rendering caption events...")
+                    self.encode_caption_events(output_path, temp_image, fps)
+                elif self.render_mode == 'stream':
+                    self.update_status("Rendering and encoding final video...")
+                    self.stream_final_video(output_path, temp_image, fps)
+                elif self.render_mode == 'ass':
+                    self.encode_ass(output_path, temp_image, fps)
+                elif self.render_mode == 'segments':
+                    self.update_status("Rendering and encoding segments in parallel...")
+                    self.encode_segments(output_path, temp_image, fps)
+                else:
+                    self.update_status("Creating animated text frames...")
+                    with tracer.span('generate_frames'):
+                        frames_dir = self.generate_frames(fps)
+
+                    self.update_status("Generating green screen with text...")
+                    self.generate_green_screen(frames_dir, temp_image)
+
+                    self.update_status("Creating final video...")
+                    with tracer.span('encode'):
+                        self.create_final_video(frames_dir, output_path, fps)
+
+            if not os.path.exists(temp_image):
+                raise FileNotFoundError(f"Green screen image not created: {temp_image}")
+            tracer.count('output_bytes', os.path.getsize(output_path))
+
+            if self.export_subtitles:
+                with tracer.span('export_ass', stage=True):
+                    subtitles_path = os.path.splitext(output_path)[0] + ".ass"
+                    self.export_ass(subtitles_path, *self.canvas_size())
+                self.update_status(f"Subtitles saved as: {subtitles_path}")
+
+            return output_path
+        finally:
+            # Clean up the job's scratch directory, frames included
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self.work_dir = self.temp_dir
+
+            if self.trace_path:
+                # The shared layout cache may also serve other jobs running
+                # in this process, so its numbers are approximate
+                tracer.count('layout_cache_hits', caption_layout.rendered.hits - layout_hits)
+                tracer.count('layout_cache_misses', caption_layout.rendered.misses - layout_misses)
+                tracer.save(self.trace_path, video=self.video_path, render_mode=self.render_mode,
+                            output_mode=self.output_mode, model=self.model_name)
+
+    def extract_audio(self, video_path, sample_rate=WHISPER_SAMPLE_RATE):
+        # Decode the audio track once with ffmpeg into a raw 16 kHz mono
+        # float32 file in the scratch directory and memory-map it. The cache
+        # key, the chunk cuts and the parallel workers read the file without
+        # another in-memory copy; a single-pass Whisper transcribe still
+        # copies the whole track into a tensor and builds its full mel, so
+        # that path holds all of the audio in RAM while it runs.
+        try:
+            video_path = os.path.abspath(video_path)
+            if not os.path.exists(video_path):
+                raise FileNotFoundError(f"Video file not found: {video_path}")
+
+            audio_path = os.path.join(self.work_dir, "audio.f32")
+            stream = ffmpeg.input(video_path)
+            stream = ffmpeg.output(stream.audio, audio_path, format='f32le', acodec='pcm_f32le',
+                                   ac=1, ar=sample_rate)
+            with self.tracer.span('ffmpeg_decode'):
+                ffmpeg.run(stream, cmd=FFMPEG_COMMAND, capture_stdout=True,
+                           capture_stderr=True, overwrite_output=True)
+
+            if os.path.getsize(audio_path) < 4:
+                raise ValueError("No audio found in video file")
+            # Copy-on-write, so Whisper can treat it as a writable array
+            return np.memmap(audio_path, dtype=np.float32, mode='c')
+
+        except ffmpeg.Error as e:
+            stderr = e.stderr.decode(errors='replace') if e.stderr else str(e)
+            print(f"Error extracting audio: {stderr}", file=sys.stderr)
+            if 'matches no streams' in stderr:
+                self.update_status("Error: No audio found in video file")
+                raise ValueError("No audio found in video file")
+            self.update_status("Error: Could not decode audio from video file")
+            raise Exception(f"FFmpeg error: {stderr}")
+        except Exception as e:
+            print(f"Error extracting audio: {str(e)}", file=sys.stderr)
+            self.update_status(f"Error: {str(e)}")
+            raise
+
+    def transcribe_audio(self, audio, sample_rate=WHISPER_SAMPLE_RATE):
+        try:
+            # Reuse an earlier transcript of the same audio, model and options
+            cache_key = None
+            if self.transcription_cache is not None:
+                cache_key = self.transcription_cache.make_key(
+                    audio, sample_rate, self.model_name, self.cache_options(audio, sample_rate))
+                cached = self.transcription_cache.load(cache_key)
+                if cached is not None:
+                    self.tracer.count('transcript_cache_hits')
+                    self.update_status("Using cached transcription...")
+                    self.transcription_data = [TranscriptSegment.from_dict(segment) for segment in cached]
+                    self.timeline = None
+                    return ' '.join(segment.text for segment in self.transcription_data)
+            
+            if self.chunked_transcriber is not None and self.chunked_transcriber.should_split(audio, sample_rate):
+                # Long recordings are split at quiet points and transcribed
+                # across a process pool
+                self.update_status(f"Transcribing audio in parallel ({self.transcribe_workers} workers)...")
+                with self.tracer.span('whisper', workers=self.transcribe_workers):
+                    segments = self.chunked_transcriber.transcribe(audio, sample_rate,
+                                                                   self.transcribe_options)
+            else:
+                # Load model and transcribe the in-memory samples directly
+                with self.tracer.span('load_model'):
+                    model = whisper_models.get(self.model_name)
+                with self.tracer.span('whisper'):
+                    result = model.transcribe(audio, **self.transcribe_options)
+                
+                if not result or 'segments' not in result:
+                    raise ValueError("Transcription failed - no segments generated")
+                segments = result['segments']
+            
+            # Store transcription data with timestamps
+            self.transcription_data = self.segment_records(segments)
+            self.timeline = None
+            
+            if cache_key is not None:
+                self.tracer.count('transcript_cache_misses')
+                self.transcription_cache.store(cache_key,
+                                               [segment.to_dict() for segment in self.transcription_data])
+            
+            # Return combined text for backward compatibility
+            return ' '.join(segment.text for segment in self.transcription_data)
+            
+        except Exception as e:
+            print(f"Error in transcription: {str(e)}", file=sys.stderr)
+            self.update_status(f"Transcription error: {str(e)}")
+            raise
+
+    def segment_records(self, segments, offset=0.0):
+        # TranscriptSegments for Whisper segments, shifted by offset seconds.
+        # Only text and times are kept; Whisper's tokens and scores are dropped.
+        records = []
+        for segment in segments:
+            if 'words' in segment:
+                words = [TimedWord(word['text'], word['start'] + offset, word['end'] + offset)
+                         for word in segment['words']]
+            else:
+                words = [TimedWord(segment['text'], segment['start'] + offset, segment['end'] + offset)]
+            records.append(TranscriptSegment(segment['text'], segment['start'] + offset,
+                                             segment['end'] + offset, words))
+        return records
+
+    def window_cut(self, audio, sample_rate, search_seconds=5, frame_seconds=0.03):
+        # Sample offset of the quietest frame within the last search_seconds
+        # of the audio, so a window is not cut in the middle of a word
+        frame_size = max(1, int(frame_seconds * sample_rate))
+        low = max(0, len(audio) - int(search_seconds * sample_rate)) // frame_size
+        if len(audio) // frame_size <= low:
+            return len(audio)
+        energy = frame_energy(audio[low * frame_size:], frame_size)
+        return (low + int(np.argmin(energy))) * frame_size + frame_size // 2
+
+    def transcribe_windows(self, sample_rate=WHISPER_SAMPLE_RATE):
+        # Yields (records, committed_until) as each audio window is read and
+        # transcribed. Every window is cut at a quiet point near its end;
+        # the audio after the cut is carried into the next window, so only
+        # about one window of audio is ever held in memory.
+        reader = AudioWindowReader(self.video_path, self.window_seconds, sample_rate)
+        carry = np.empty(0, dtype=np.float32)
+        offset = 0.0
+        for samples, is_last in reader:
+            audio = np.concatenate((carry, samples)) if carry.size else samples
+            if not audio.size:
+                break
+            cut = len(audio) if is_last else self.window_cut(audio, sample_rate)
+
+            self.update_status(f"Transcribing from {ass_timestamp(offset)[:-3]}...")
+            with self.tracer.span('whisper', window_start=round(offset, 3)):
+                model = whisper_models.get(self.model_name)
+                result = model.transcribe(np.ascontiguousarray(audio[:cut]), **self.transcribe_options)
+            if not result or 'segments' not in result:
+                raise ValueError("Transcription failed - no segments generated")
+
+            records = self.segment_records(result['segments'], offset)
+            offset += cut / sample_rate
+            carry = audio[cut:]
+            yield records, offset
+
+    def incremental_runs(self, fps):
+        # Caption runs (text, active_word, start_frame, frame_count) produced
+        # window by window. Only caption chunks that are still on screen at
+        # the end of a window are kept for the next one.
+        visible = []
+        emitted = 0
+        held = None
+        for records, committed_until in self.transcribe_windows():
+            if self.export_subtitles:
+                self.transcription_data.extend(records)
+            chunks = visible + self.prepare_segments(records)
+            end_frame = int(committed_until * fps)
+            timeline = CaptionTimeline(chunks)
+            if self.animation == 'highlight':
+                runs = timeline.word_runs(fps, end_frame, emitted)
+            else:
+                runs = [(text, None, start_frame, frame_count)
+                        for text, start_frame, frame_count in timeline.frame_runs(fps, end_frame, emitted)]
+
+            # The last run may continue into the next window, so it is held
+            # back and merged when the next window starts with the same state
+            for run in runs:
+                if held is not None and held[:2] == run[:2]:
+                    held = (held[0], held[1], held[2], held[3] + run[3])
+                    continue
+                if held is not None:
+                    yield held
+                held = run
+
+            emitted = max(emitted, end_frame)
+            visible = [chunk for chunk in chunks if chunk.end >= emitted / fps]
+        if held is not None:
+            yield held
+
+    def encode_incremental(self, output_path, preview_path, fps=DEFAULT_FPS):
+        # Transcribe, render and encode window by window into a fragmented
+        # MP4 or HLS output that players can open while it is still growing.
+        # Future captions are unknown, so the full frame is rendered instead
+        # of a caption band.
+        if self.export_subtitles:
+            self.transcription_data = []
+        self.stream_runs(self.incremental_runs(fps), output_path, preview_path, fps, None)
+
+    def render_frame(self, frame_text, width=1920, height=1080, band=None):
+        # Rendered captions are cached by the layout engine and shared;
+        # callers must copy the image before drawing on it
+        return caption_layout.render(frame_text, self.font_path, self.font_size, width, height,
+                                     self.caption_background(), band)
+
+    def generate_frame(self, frame_text, output_path, width=1920, height=1080, band=None):
+        with self.tracer.span('render'):
+            image = self.render_frame(frame_text, width, height, band)
+        with self.tracer.span('write_image'):
+            image.save(output_path)
+        self.tracer.count('bytes_written', os.path.getsize(output_path))
+
+    def prepare_segments(self, transcription_data=None):
+        if transcription_data is None:
+            if not hasattr(self, 'transcription_data'):
+                raise ValueError("No transcription data available. Run transcribe_audio first.")
+            transcription_data = self.transcription_data
+
+        # Prepare segments with simple text splitting
+        segments = []
+        words_per_segment = 6  # Number of words per segment
+        
+        for segment in transcription_data:
+            # Get segment text safely
+            segment_text = segment.text.strip()
+            if not segment_text:
+                continue
+            
+            # Prefer Whisper's word timestamps; fall back to spreading the
+            # segment duration evenly when only segment times are known
+            words = self.segment_words(segment)
+            if not words:
+                continue
+            
+            # Create segments of fixed size
+            for i in range(0, len(words), words_per_segment):
+                word_chunk = words[i:i + words_per_segment]
+                chunk_text = ' '.join(word.text for word in word_chunk)
+                
+                start_time = word_chunk[0].start
+                end_time = word_chunk[-1].end
+                
+                # Add some padding to keep text visible longer
+                end_time += 0.5  # Keep text visible for 0.5 seconds after it should disappear
+                
+                segments.append(TranscriptSegment(chunk_text, start_time, end_time, word_chunk))
+        
+        # Sort segments by start time
+        segments.sort(key=lambda x: x.start)
+        return segments
+
+    def segment_words(self, segment):
+        # Whitespace-separated TimedWords of a segment
+        timed_words = [word for word in segment.words if word.text]
+        if timed_words and all(len(word.text.split()) == 1 for word in timed_words):
+            return timed_words
+
+        # Calculate timing based on segment duration
+        texts = segment.text.split()
+        segment_duration = segment.end - segment.start
+        return [TimedWord(text,
+                          segment.start + (i * segment_duration / len(texts)),
+                          segment.start + ((i + 1) * segment_duration / len(texts)))
+                for i, text in enumerate(texts)]
+
+    def get_timeline(self):
+        # Build the caption interval index once and share it between the
+        # preview and final video paths
+        if self.timeline is None:
+            self.timeline = CaptionTimeline(self.prepare_segments())
+        return self.timeline
+
+    def total_frames(self, fps=DEFAULT_FPS):
+        # Calculate total frames needed
+        total_duration = max(segment.end for segment in self.transcription_data)
+        return int(total_duration * fps)
+
+    def caption_states(self, fps=DEFAULT_FPS):
+        # Distinct caption states as (text, start_frame, frame_count)
+        timeline = self.get_timeline()
+        return timeline.frame_runs(fps, self.total_frames(fps))
+
+    def caption_runs(self, fps=DEFAULT_FPS):
+        # Distinct rendered states as (text, active_word, start_frame,
+        # frame_count); active_word is None unless words are highlighted
+        if self.animation == 'highlight':
+            timeline = self.get_timeline()
+            return timeline.word_runs(fps, self.total_frames(fps))
+        return [(text, None, start_frame, frame_count)
+                for text, start_frame, frame_count in self.caption_states(fps)]
+
+    def iter_frame_texts(self, fps=DEFAULT_FPS, report_progress=True):
+        # Yields (frame_num, text, changed) for every frame of the caption timeline
+        total_frames = self.total_frames(fps)
+
+        for text, start_frame, frame_count in self.caption_states(fps):
+            for frame_num in range(start_frame, start_frame + frame_count):
+                yield frame_num, text, frame_num == start_frame
+
+                # Update progress
+                if report_progress:
+                    progress = (frame_num + 1) / total_frames * 100
+                    self.report_progress(progress, f"Generating frames: {progress:.1f}%")
+
+    def generate_frames(self, fps=DEFAULT_FPS):
+        # Create frames directory
+        frames_dir = os.path.join(self.work_dir, "frames")
+        os.makedirs(frames_dir, exist_ok=True)
+        width, height = self.canvas_size()
+        band = self.caption_band(width, height, fps)
+        
+        try:
+            last_frame_path = None
+            
+            for frame_num, text, changed in self.iter_frame_texts(fps):
+                frame_path = os.path.join(frames_dir, f"frame_{frame_num:06d}.jpg")
+                
+                # Only generate new frame if text changed
+                if changed:
+                    self.generate_frame(text, frame_path, width, height, band)
+                    last_frame_path = frame_path
+                    self.tracer.count('frames_rendered')
+                else:
+                    # Reuse last frame by creating a copy
+                    shutil.copy2(last_frame_path, frame_path)
+                    self.tracer.count('frames_reused')
+                    self.tracer.count('bytes_written', os.path.getsize(frame_path))
+            
+            return frames_dir
+            
+        except Exception as e:
+            # Clean up frames directory on error
+            shutil.rmtree(frames_dir, ignore_errors=True)
+            raise e
+
+    def generate_green_screen(self, frames_dir, output_path):
+        # Use the last rendered frame as the output image
+        frame_files = sorted(os.listdir(frames_dir))
+        if not frame_files:
+            raise ValueError("No frames were generated")
+
+        last_frame = os.path.join(frames_dir, frame_files[-1])
+        shutil.copy2(last_frame, output_path)
+
+    def create_final_video(self, frames_dir, output_path, fps=DEFAULT_FPS):
+        try:
+            # Create output directory
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+            # The frames only hold the caption band; it is padded back out
+            # to the source resolution while encoding
+            width, height = self.canvas_size()
+            band = self.caption_band(width, height, fps)
+
+            # Create video from frame sequence using ffmpeg
+            self.update_status("Creating final video from frames...")
+            frame_pattern = os.path.join(frames_dir, 'frame_%06d.jpg')
+            stream = ffmpeg.input(frame_pattern, pattern_type='sequence', framerate=fps)
+            stream = self.build_output(stream, output_path, self.total_frames(fps), band)
+            ffmpeg.run(stream, cmd=FFMPEG_COMMAND, overwrite_output=True,
+                       capture_stdout=True, capture_stderr=True)
+            
+            # Verify output file exists
+            if not os.path.exists(output_path):
+                raise FileNotFoundError(f"Failed to create final video: {output_path}")
+                
+        except ffmpeg.Error as e:
+            print(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}", file=sys.stderr)
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        except Exception as e:
+            print(f"Error creating final video: {str(e)}", file=sys.stderr)
+            raise
+
+
+    def stream_final_video(self, output_path, preview_path, fps=DEFAULT_FPS):
+        # Render frames straight into a long-lived ffmpeg process over stdin.
+        # Nothing is written to disk except the output video and the preview,
+        # and a writer thread lets ffmpeg encode while the next frames render.
+        # Frames are composed into a small pool of reusable buffers that are
+        # handed to the encoder without copying.
+        width, height = self.canvas_size()
+        band = self.caption_band(width, height, fps)
+        runs = self.caption_runs(fps)
+        self.stream_runs(runs, output_path, preview_path, fps, band,
+                         sum(frame_count for _, _, _, frame_count in runs))
+
+    def stream_runs(self, runs, output_path, preview_path, fps, band, total_frames=None, first_frame=0):
+        # Streams caption runs through one encoder process. The 'segments'
+        # workers call this for their slice of the timeline and the
+        # 'incremental' mode with a generator whose length is unknown
+        # (total_frames None). No preview is written when preview_path is None.
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        width, height = self.canvas_size()
+        compositor = FrameCompositor(width, height, self.font_path, self.font_size,
+                                     self.caption_background(), band=band)
+
+        captions = ffmpeg.input('pipe:', format='rawvideo', pix_fmt=compositor.pix_fmt,
+                                s=f'{compositor.width}x{compositor.height}', framerate=fps)
+        process = (
+            self.build_output(captions, output_path, total_frames, band)
+            .overwrite_output()
+            .run_async(cmd=FFMPEG_COMMAND, pipe_stdin=True, pipe_stderr=True)
+        )
+
+        # Drain stderr so a chatty encoder can never block on a full pipe
+        stderr_chunks = []
+        stderr_thread = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()),
+                                         name="ffmpeg-stderr", daemon=True)
+        stderr_thread.start()
+
+        # Items are (buffer index, release); a release item hands the buffer
+        # back to the pool once every queued frame using it has been written
+        frame_queue = queue.Queue(maxsize=8)
+        write_errors = []
+
+        def writer():
+            while True:
+                item = frame_queue.get()
+                if item is None:
+                    break
+                index, release = item
+                if release:
+                    compositor.release(index)
+                    continue
+                if write_errors:
+                    continue
+                try:
+                    process.stdin.write(compositor.view(index))
+                except Exception as e:
+                    write_errors.append(e)
+
+        writer_thread = threading.Thread(target=writer, name="frame-writer", daemon=True)
+        writer_thread.start()
+
+        current = None
+        preview = None
+        try:
+            self.update_status("Streaming frames to encoder...")
+            for text, active, start_frame, frame_count in runs:
+                if write_errors:
+                    break
+                # Only compose a new frame when the caption state changes;
+                # every frame of the run sends the same buffer again
+                if current is not None:
+                    frame_queue.put((current, True))
+                with self.tracer.span('compose'):
+                    current = compositor.compose(text, active)
+                for _ in range(frame_count):
+                    frame_queue.put((current, False))
+                self.tracer.count('frames_rendered')
+                self.tracer.count('frames_reused', frame_count - 1)
+                self.tracer.count('bytes_piped', frame_count * compositor.view(current).nbytes)
+
+                # Update progress
+                if total_frames:
+                    progress = (start_frame + frame_count - first_frame) / total_frames * 100
+                    self.report_progress(progress, f"Generating frames: {progress:.1f}%")
+                else:
+                    done = ass_timestamp((start_frame + frame_count) / fps)[:-3]
+                    self.report_progress(0, f"Captioned up to {done}")
+            if current is not None:
+                if preview_path is not None:
+                    preview = Image.fromarray(compositor.frame(current).copy())
+                frame_queue.put((current, True))
+        finally:
+            frame_queue.put(None)
+            with self.tracer.span('drain_encoder'):
+                writer_thread.join()
+            try:
+                process.stdin.close()
+            except Exception:
+                pass
+            process.wait()
+            stderr_thread.join()
+
+        if process.returncode != 0 or write_errors:
+            stderr = b''.join(chunk for chunk in stderr_chunks if chunk).decode(errors='replace')
+            print(f"FFmpeg error: {stderr or write_errors}", file=sys.stderr)
+            raise Exception(f"FFmpeg error: {stderr or write_errors[0]}")
+
+        if current is None:
+            raise ValueError("No frames were generated")
+        if preview is not None:
+            preview.save(preview_path)
+
+        # Verify output file exists
+        if not os.path.exists(output_path):
+            raise FileNotFoundError(f"Failed to create final video: {output_path}")
+
+    def encode_segments(self, output_path, preview_path, fps=DEFAULT_FPS):
+        # Split the caption timeline at caption changes into one piece per
+        # worker, stream every piece through its own encoder process in
+        # parallel and join the pieces with the concat demuxer, copying the
+        # encoded streams instead of re-encoding them
+        runs = self.caption_runs(fps)
+        if not runs:
+            raise ValueError("No frames were generated")
+        width, height = self.canvas_size()
+        band = self.caption_band(width, height, fps)
+        groups = split_runs(runs, max(1, self.encode_workers))
+
+        segments_dir = os.path.join(self.work_dir, "segments")
+        os.makedirs(segments_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        extension = os.path.splitext(output_path)[1]
+
+        settings = []
+        for index, group in enumerate(groups):
+            settings.append({
+                'video_path': self.video_path,
+                'font_path': self.font_path,
+                'font_size': self.font_size,
+                'temp_dir': self.work_dir,
+                'source': self.source_info(),
+                'output_mode': self.output_mode,
+                'alpha_codec': self.alpha_codec,
+                'animation': self.animation,
+                'encoder_preset': self.encoder_preset,
+                'runs': group,
+                'fps': fps,
+                'band': band,
+                'output_path': os.path.join(segments_dir, f"segment_{index:04d}{extension}"),
+                # The last frame of the timeline doubles as the preview
+                'preview_path': preview_path if index == len(groups) - 1 else None,
+            })
+
+        try:
+            total_frames = sum(frame_count for _, _, _, frame_count in runs)
+            frames_done = 0
+            self.update_status(f"Encoding {len(groups)} segments in parallel...")
+            context = multiprocessing.get_context('spawn')
+            with self.tracer.span('encode_segments', segments=len(groups)):
+                with concurrent.futures.ProcessPoolExecutor(max_workers=len(groups),
+                                                            mp_context=context) as executor:
+                    futures = [executor.submit(_encode_caption_segment, segment) for segment in settings]
+                    for future in concurrent.futures.as_completed(futures):
+                        frames_done += future.result()
+                        progress = frames_done / total_frames * 100
+                        self.report_progress(progress, f"Encoding segments: {progress:.1f}%")
+            self.tracer.count('frames_rendered', len(runs))
+            self.tracer.count('frames_reused', total_frames - len(runs))
+
+            concat_path = os.path.join(segments_dir, "segments.ffconcat")
+            with open(concat_path, 'w', encoding='utf-8') as f:
+                f.write("ffconcat version 1.0\n")
+                for segment in settings:
+                    f.write(f"file '{os.path.basename(segment['output_path'])}'\n")
+
+            self.update_status("Joining segments...")
+            stream = ffmpeg.input(concat_path, format='concat', safe=0)
+            stream = ffmpeg.output(stream, output_path, c='copy')
+            with self.tracer.span('concat'):
+                ffmpeg.run(stream, cmd=FFMPEG_COMMAND, overwrite_output=True,
+                           capture_stdout=True, capture_stderr=True)
+
+            # Verify output file exists
+            if not os.path.exists(output_path):
+                raise FileNotFoundError(f"Failed to create final video: {output_path}")
+
+        except ffmpeg.Error as e:
+            print(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}", file=sys.stderr)
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        finally:
+            shutil.rmtree(segments_dir, ignore_errors=True)
+
+    def encode_caption_events(self, output_path, preview_path, fps=DEFAULT_FPS):
+        # Render each distinct caption state once and let ffmpeg hold every
+        # still for its duration through the concat demuxer, so rendering
+        # cost scales with the number of caption changes, not video length
+        states = self.caption_runs(fps)
+        if not states:
+            raise ValueError("No frames were generated")
+        width, height = self.canvas_size()
+        band = self.caption_band(width, height, fps)
+        compositor = None
+        if self.animation == 'highlight':
+            compositor = FrameCompositor(width, height, self.font_path, self.font_size,
+                                         self.caption_background(), pool_size=1, band=band)
+
+        states_dir = os.path.join(self.work_dir, "states")
+        os.makedirs(states_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        try:
+            concat_lines = ["ffconcat version 1.0"]
+            last_image = None
+            for index, (text, active, start_frame, frame_count) in enumerate(states):
+                state_path = os.path.join(states_dir, f"state_{index:06d}.png")
+                if compositor is not None:
+                    # Consecutive states usually differ only in the active
+                    # word, which the compositor redraws incrementally
+                    with self.tracer.span('compose'):
+                        buffer_index = compositor.compose(text, active)
+                        last_image = Image.fromarray(compositor.frame(buffer_index))
+                    with self.tracer.span('write_image'):
+                        last_image.save(state_path)
+                    compositor.release(buffer_index)
+                else:
+                    with self.tracer.span('render'):
+                        last_image = self.render_frame(text, width, height, band)
+                    with self.tracer.span('write_image'):
+                        last_image.save(state_path)
+                self.tracer.count('frames_rendered')
+                self.tracer.count('frames_reused', frame_count - 1)
+                self.tracer.count('bytes_written', os.path.getsize(state_path))
+
+                # Durations come from frame boundaries so rounding never drifts,
+                # and the still is opened at the output rate so its timestamps
+                # land exactly on frame boundaries
+                duration = (start_frame + frame_count) / fps - start_frame / fps
+                concat_lines.append(f"file '{os.path.basename(state_path)}'")
+                concat_lines.append(f"option framerate {fps}")
+                concat_lines.append(f"duration {duration:.6f}")
+
+                progress = (index + 1) / len(states) * 100
+                self.report_progress(progress, f"Rendering caption states: {progress:.1f}%")
+
+            # The concat demuxer ignores the duration of the final entry
+            # unless the file is listed once more
+            concat_lines.extend(concat_lines[-3:-1])
+
+            concat_path = os.path.join(states_dir, "captions.ffconcat")
+            with open(concat_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(concat_lines) + '\n')
+
+            total_frames = states[-1][2] + states[-1][3]
+            self.update_status("Encoding caption events...")
+            captions = ffmpeg.input(concat_path, format='concat', safe=0)
+            captions = captions.filter('fps', fps=fps)
+            stream = self.build_output(captions, output_path, total_frames, band)
+            with self.tracer.span('encode'):
+                ffmpeg.run(stream, cmd=FFMPEG_COMMAND, overwrite_output=True,
+                           capture_stdout=True, capture_stderr=True)
+
+            last_image.copy().save(preview_path)
+
+            # Verify output file exists
+            if not os.path.exists(output_path):
+                raise FileNotFoundError(f"Failed to create final video: {output_path}")
+
+        except ffmpeg.Error as e:
+            print(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}", file=sys.stderr)
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        finally:
+            shutil.rmtree(states_dir, ignore_errors=True)
+
+    def font_family(self):
+        # Family name libass uses to find the selected font
+        try:
+            return caption_layout.get_font(self.font_path, self.font_size).getname()[0]
+        except Exception:
+            return "Arial"
+
+    def export_ass(self, output_path, width=1920, height=1080):
+        # Write the captions as an ASS subtitle file styled with the chosen
+        # font. Every word gets a \k karaoke tag timed from Whisper's word
+        # timestamps, so libass turns each upcoming (white) word into the
+        # regular black caption colour as it is spoken.
+        background = self.caption_background()
+        back_colour = "&H0000FF00" if background is not None else "&HFF000000"
+        lines = [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            f"PlayResX: {width}",
+            f"PlayResY: {height}",
+            "WrapStyle: 0",
+            "ScaledBorderAndShadow: yes",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+            "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+            "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+            f"Style: Caption,{self.font_family()},{self.font_size},&H00000000,&H00FFFFFF,&H00000000,"
+            f"{back_colour},0,0,0,0,100,100,0,0,1,0,0,5,50,50,0,1",
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+        ]
+
+        for segment in self.prepare_segments():
+            words = segment.words
+            parts = []
+            for i, word in enumerate(words):
+                # Each word is highlighted until the next one starts; rounding
+                # the absolute times keeps centisecond errors from accumulating
+                word_end = words[i + 1].start if i + 1 < len(words) else word.end
+                duration = max(0, round(word_end * 100) - round(word.start * 100))
+                parts.append(f"{{\\k{duration}}}{ass_escape(word.text)}")
+            lines.append(f"Dialogue: 0,{ass_timestamp(segment.start)},{ass_timestamp(segment.end)},"
+                         f"Caption,,0,0,0,,{' '.join(parts)}")
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return output_path
+
+    def encode_ass(self, output_path, preview_path, fps=DEFAULT_FPS):
+        # Let libass draw the captions inside ffmpeg through the ass filter;
+        # there is no Python rasterisation at all on this path
+        width, height = self.canvas_size()
+        total_frames = self.total_frames(fps)
+        if total_frames <= 0:
+            raise ValueError("No frames were generated")
+
+        ass_path = self.export_ass(os.path.join(self.work_dir, "captions.ass"), width, height)
+        # Forward slashes keep Windows drive paths readable by the filter parser
+        filter_path = ass_path.replace('\\', '/')
+        fonts_dir = os.path.dirname(os.path.abspath(self.font_path)).replace('\\', '/')
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        try:
+            self.update_status("Rendering captions with libass...")
+            if self.output_mode == 'burnin':
+                source = ffmpeg.input(self.video_path)
+                video = source.video.filter('ass', filter_path, fontsdir=fonts_dir)
+                stream = ffmpeg.output(video, source.audio, output_path, acodec='copy',
+                                       **self.x264_options())
+            else:
+                duration = total_frames / fps
+                if self.output_mode == 'alpha':
+                    captions = ffmpeg.input(f'color=c=black@0.0:s={width}x{height}:r={fps}',
+                                            format='lavfi', t=duration)
+                    captions = captions.filter('format', 'rgba')
+                    captions = captions.filter('ass', filter_path, fontsdir=fonts_dir, alpha=1)
+                else:
+                    captions = ffmpeg.input(f'color=c=0x00FF00:s={width}x{height}:r={fps}',
+                                            format='lavfi', t=duration)
+                    captions = captions.filter('ass', filter_path, fontsdir=fonts_dir)
+                stream = self.build_output(captions, output_path, total_frames)
+            ffmpeg.run(stream, cmd=FFMPEG_COMMAND, overwrite_output=True,
+                       capture_stdout=True, capture_stderr=True)
+
+            # Verify output file exists
+            if not os.path.exists(output_path):
+                raise FileNotFoundError(f"Failed to create final video: {output_path}")
+
+            # The preview is the last captioned frame of the encoded output
+            preview = ffmpeg.input(output_path, ss=max(0, (total_frames - 1) / fps))
+            preview = ffmpeg.output(preview, preview_path, vframes=1)
+            ffmpeg.run(preview, cmd=FFMPEG_COMMAND, overwrite_output=True,
+                       capture_stdout=True, capture_stderr=True)
+
+        except ffmpeg.Error as e:
+            print(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}", file=sys.stderr)
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+
+def _encode_caption_segment(settings):
+    # Runs in a pool worker: composes and encodes one slice of the caption
+    # timeline through the same path as the 'stream' render mode
+    job = CaptionJob(settings['video_path'], settings['font_path'], settings['temp_dir'],
+                     status_callback=lambda message: None,
+                     render_mode='stream', use_cache=False,
+                     output_mode=settings['output_mode'],
+                     alpha_codec=settings['alpha_codec'],
+                     animation=settings['animation'],
+                     encoder_preset=settings['encoder_preset'])
+    job.source = settings['source']
+    job.font_size = settings['font_size']
+    runs = settings['runs']
+    total_frames = sum(frame_count for _, _, _, frame_count in runs)
+    job.stream_runs(runs, settings['output_path'], settings['preview_path'],
+                    settings['fps'], settings['band'], total_frames, runs[0][2])
+    return total_frames
 
 class VideoToGreenScreenApp:
     def __init__(self, master):
         self.master = master
         master.title("MrBeast-Style Green Screen Generator")
-        master.geometry("600x400")
+        master.geometry("600x590")
         
         self.font_path = None
         self.video_path = None
@@ -29,12 +2311,48 @@ class VideoToGreenScreenApp:
         if not os.path.exists(self.temp_dir):
             os.makedirs(self.temp_dir)
         
-        self.check_ffmpeg()
         self.create_widgets()
         self.setup_drag_and_drop()
         self.update_status("Please select a font file to begin")
 
+        # Probe ffmpeg and start loading Whisper only once the window is up
+        self.master.after_idle(self.start_prewarm)
+
+    def start_prewarm(self):
+        # The ffmpeg probe and the Whisper/torch import run off the Tk
+        # thread; only the probe's outcome comes back, through a channel
+        # polled by the main loop
+        channel = ProgressChannel()
+        model_name = self.model_var.get()
+
+        def prewarm():
+            problem = self.check_ffmpeg()
+            channel.publish('ffmpeg', problem=problem)
+            # Start loading Whisper while the user is still picking files,
+            # unless the app is about to close for want of ffmpeg
+            if problem is None or not problem[2]:
+                whisper_models.prewarm(model_name)
+
+        threading.Thread(target=prewarm, name="startup-prewarm", daemon=True).start()
+        self.poll_prewarm(channel)
+
+    def poll_prewarm(self, channel):
+        from tkinter import messagebox
+        for event in channel.drain():
+            if event['problem'] is not None:
+                title, message, fatal = event['problem']
+                if fatal:
+                    messagebox.showerror(title, message)
+                    self.master.quit()
+                else:
+                    messagebox.showwarning(title, message)
+            return
+        self.master.after(PROGRESS_POLL_MS, self.poll_prewarm, channel)
+
     def check_ffmpeg(self):
+        # None if ffmpeg runs, otherwise (title, message, fatal) for the
+        # dialog to show. Called from a background thread, so it must not
+        # touch Tk itself.
         try:
             if sys.platform == 'win32':
                 result = subprocess.run(['ffmpeg', '-version'],
@@ -57,34 +2375,35 @@ class VideoToGreenScreenApp:
                                                text=True,
                                                shell=True)
                     if where_result.returncode == 0 and where_result.stdout.strip():
-                        messagebox.showwarning("FFmpeg Warning",
+                        return ("FFmpeg Warning",
                             "FFmpeg was found but had issues running.\n"
-                            "Please try running the application again.")
-                        return
+                            "Please try running the application again.", False)
                 except:
                     pass
             
-            messagebox.showerror("FFmpeg Error",
+            return ("FFmpeg Error",
                 "FFmpeg is not properly installed or not in PATH.\n"
                 "Please install FFmpeg using:\n"
                 "winget install \"FFmpeg (Essentials Build)\"\n"
-                "Then restart your computer to ensure PATH is updated.")
-            self.master.quit()
+                "Then restart your computer to ensure PATH is updated.", True)
         except FileNotFoundError:
-            messagebox.showerror("FFmpeg Error",
+            return ("FFmpeg Error",
                 "FFmpeg is not found in PATH.\n"
                 "Please install FFmpeg using:\n"
                 "winget install \"FFmpeg (Essentials Build)\"\n"
-                "Then restart your computer to ensure PATH is updated.")
-            self.master.quit()
+                "Then restart your computer to ensure PATH is updated.", True)
         except Exception as e:
-            print(f"Unexpected error checking FFmpeg: {str(e)}")
-            messagebox.showerror("FFmpeg Error",
+            print(f"Unexpected error checking FFmpeg: {str(e)}", file=sys.stderr)
+            return ("FFmpeg Error",
                 "An unexpected error occurred while checking FFmpeg.\n"
-                "Please ensure FFmpeg is installed and try again.")
-            self.master.quit()
+                "Please ensure FFmpeg is installed and try again.", True)
+        return None
 
     def create_widgets(self):
+        # Tk is imported here rather than at module level so the headless
+        # CLI runs on Pythons built without it
+        import tkinter as tk
+        from tkinter import ttk
         self.main_frame = ttk.Frame(self.master)
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
@@ -106,6 +2425,28 @@ class VideoToGreenScreenApp:
                                      command=self.select_video)
         self.video_button.pack(pady=10)
 
+        model_frame = ttk.LabelFrame(self.main_frame, text="Transcription Model")
+        model_frame.pack(fill=tk.X, pady=10)
+
+        self.model_var = tk.StringVar(value=DEFAULT_WHISPER_MODEL)
+        self.model_combo = ttk.Combobox(model_frame, textvariable=self.model_var,
+                                        values=WHISPER_MODELS, state="readonly")
+        self.model_combo.pack(pady=10)
+        self.model_combo.bind('<<ComboboxSelected>>', self.select_model)
+
+        output_frame = ttk.LabelFrame(self.main_frame, text="Output")
+        output_frame.pack(fill=tk.X, pady=10)
+
+        self.output_var = tk.StringVar(value='greenscreen')
+        self.output_combo = ttk.Combobox(output_frame, textvariable=self.output_var,
+                                         values=OUTPUT_MODES, state="readonly")
+        self.output_combo.pack(pady=(10, 5))
+
+        self.highlight_var = tk.BooleanVar(value=False)
+        self.highlight_check = ttk.Checkbutton(output_frame, text="Highlight the spoken word",
+                                               variable=self.highlight_var)
+        self.highlight_check.pack(pady=(0, 10))
+
         self.generate_button = ttk.Button(self.main_frame, text="Generate Green Screen Video",
                                         command=self.generate_final_video)
         self.generate_button.pack(pady=20)
@@ -121,10 +2462,12 @@ class VideoToGreenScreenApp:
         self.progress_bar.pack(fill=tk.X, pady=5)
 
     def setup_drag_and_drop(self):
+        from tkinterdnd2 import DND_FILES
         self.master.drop_target_register(DND_FILES)
         self.master.dnd_bind('<<Drop>>', self.handle_file_drop)
 
     def select_font(self):
+        from tkinter import filedialog
         self.font_path = filedialog.askopenfilename(
             title="Select Font File",
             filetypes=[("Font files", "*.ttf *.otf"), ("All files", "*.*")]
@@ -133,7 +2476,13 @@ class VideoToGreenScreenApp:
             self.font_button.config(text=f"Font: {os.path.basename(self.font_path)}")
             self.update_status("Font selected. Please select a video file.")
 
+    def select_model(self, event=None):
+        model_name = self.model_var.get()
+        if not whisper_models.is_loaded(model_name):
+            whisper_models.prewarm(model_name)
+
     def select_video(self):
+        from tkinter import filedialog
         self.video_path = filedialog.askopenfilename(
             title="Select Video File",
             filetypes=[
@@ -166,387 +2515,306 @@ class VideoToGreenScreenApp:
             self.update_status("Please select both a font and video file first")
             return
 
+        import tkinter as tk
         self.generate_button.config(state=tk.DISABLED)
         self.update_status("Starting video processing...")
-        
+
+        # The worker thread never touches Tk; it only publishes events that
+        # the main loop picks up in poll_progress
+        channel = ProgressChannel()
+        job = CaptionJob(self.video_path, self.font_path, self.temp_dir,
+                         progress_channel=channel,
+                         model_name=self.model_var.get(),
+                         output_mode=self.output_var.get(),
+                         animation='highlight' if self.highlight_var.get() else 'static')
+
         def processing_thread():
             try:
-                if not os.path.exists(self.temp_dir):
-                    os.makedirs(self.temp_dir)
-                
-                temp_audio = os.path.join(self.temp_dir, "temp_audio.wav")
-                temp_image = os.path.join(self.temp_dir, "temp_greenscreen.jpg")
-                temp_whisper = os.path.join(self.temp_dir, "temp_whisper.wav")
-                
-                for temp_file in [temp_audio, temp_image, temp_whisper]:
-                    if os.path.exists(temp_file):
-                        try:
-                            os.remove(temp_file)
-                        except Exception as e:
-                            print(f"Warning: Could not remove temporary file {temp_file}: {str(e)}")
-
-                self.update_status("Extracting audio from video...")
-                self.extract_audio(self.video_path, temp_audio)
-
-                if not os.path.exists(temp_audio):
-                    raise FileNotFoundError(f"Audio file not created: {temp_audio}")
-                
-                time.sleep(2)
-                    
-                self.update_status("Transcribing audio...")
-                self.transcribed_text = self.transcribe_audio(temp_audio)
-
-                self.update_status("Generating green screen with text...")
-                self.generate_green_screen(self.transcribed_text, temp_image)
+                output_path = job.run()
+                self.transcribed_text = job.transcribed_text
+                channel.publish('done', output=output_path)
+            except Exception as e:
+                print(f"Error in processing: {str(e)}", file=sys.stderr)
+                channel.publish('error', error=str(e))
 
-                if not os.path.exists(temp_image):
-                    raise FileNotFoundError(f"Green screen image not created: {temp_image}")
+        threading.Thread(target=processing_thread).start()
+        self.poll_progress(channel)
 
-                self.update_status("Creating final video...")
-                output_path = os.path.normpath(os.path.splitext(self.video_path)[0] + "_greenscreen.mp4")
-                self.create_final_video(temp_image, output_path)
+    def poll_progress(self, channel):
+        import tkinter as tk
+        finished = False
+        for event in channel.drain():
+            if event['type'] == 'progress':
+                self.progress_var.set(event['progress'])
+                if event['message']:
+                    self.status_label.config(text=event['message'])
+            elif event['type'] == 'status':
+                self.status_label.config(text=event['message'])
+            elif event['type'] == 'done':
+                self.status_label.config(text=f"Done! Video saved as: {event['output']}")
+                finished = True
+            elif event['type'] == 'error':
+                self.status_label.config(text=f"Error: {event['error']}")
+                finished = True
 
-                for temp_file in [temp_audio, temp_image, temp_whisper]:
-                    if os.path.exists(temp_file):
-                        try:
-                            os.remove(temp_file)
-                        except:
-                            pass
+        if finished:
+            self.generate_button.config(state=tk.NORMAL)
+        else:
+            self.master.after(PROGRESS_POLL_MS, self.poll_progress, channel)
 
-                self.update_status(f"Done! Video saved as: {output_path}")
-            except Exception as e:
-                print(f"Error in processing: {str(e)}")
-                self.update_status(f"Error: {str(e)}")
-            finally:
-                self.generate_button.config(state=tk.NORMAL)
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
 
-        threading.Thread(target=processing_thread).start()
+def expand_video_paths(patterns):
+    # Accept files, directories and glob patterns (shells on Windows do not
+    # expand globs), keeping the given order and dropping duplicates
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(os.path.join(pattern, name) for name in os.listdir(pattern)
+                             if name.lower().endswith(VIDEO_EXTENSIONS))
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+        for path in matches:
+            path = os.path.abspath(path)
+            if path not in paths:
+                paths.append(path)
+    return paths
 
-    def extract_audio(self, video_path, output_path):
-        clip = None
-        try:
-            # Ensure temp directory exists
-            if not os.path.exists(self.temp_dir):
-                os.makedirs(self.temp_dir)
-            
-            # Convert paths to absolute paths
-            video_path = os.path.abspath(video_path)
-            output_path = os.path.abspath(output_path)
-            
-            clip = moviepy.editor.VideoFileClip(video_path)
-            
-            if clip.audio is None:
-                raise ValueError("No audio found in video file")
-            
-            # Write audio file
-            clip.audio.write_audiofile(output_path)
-            
-            # Close the clip
-            clip.close()
-            clip = None
-            
-            # Wait to ensure file is written
-            time.sleep(2)
-            
-            # Verify file exists
-            if not os.path.exists(output_path):
-                raise FileNotFoundError(f"Failed to create audio file: {output_path}")
-                
-        except Exception as e:
-            print(f"Error extracting audio: {str(e)}")
-            self.update_status(f"Error: {str(e)}")
-            raise
-        finally:
-            if clip is not None:
-                try:
-                    clip.close()
-                except:
-                    pass
+def _run_batch_job(settings):
+    # Runs in a pool worker; models loaded here stay resident for the
+    # following jobs handled by the same worker
+    video_path = settings['video_path']
+    started = time.time()
+    channel = ProgressChannel(video_path)
+    reporter = threading.Thread(target=channel.follow, args=(PROGRESS_REPORTERS[settings['progress']],),
+                                name="progress-reporter", daemon=True)
+    reporter.start()
+    job = CaptionJob(
+        video_path, settings['font_path'], settings['temp_dir'],
+        progress_channel=channel,
+        render_mode=settings['render_mode'],
+        model_name=settings['model_name'],
+        use_cache=settings['use_cache'],
+        transcribe_workers=settings['transcribe_workers'],
+        output_path=settings['output_path'],
+        output_mode=settings['output_mode'],
+        alpha_codec=settings['alpha_codec'],
+        export_subtitles=settings['export_subtitles'],
+        animation=settings['animation'],
+        encode_workers=settings['encode_workers'],
+        encoder_preset=settings['encoder_preset'],
+        live_format=settings['live_format'],
+        window_seconds=settings['window_seconds'],
+        trace_path=settings['trace_path'],
+        profile_dir=settings['profile_dir'],
+    )
+    try:
+        output_path = job.run()
+        channel.publish('done', output=output_path)
+        result = {'video': video_path, 'status': 'ok', 'output': output_path,
+                  'seconds': round(time.time() - started, 3)}
+    except Exception as e:
+        channel.publish('error', error=str(e))
+        result = {'video': video_path, 'status': 'failed', 'error': str(e),
+                  'seconds': round(time.time() - started, 3)}
+    reporter.join()
+    if settings['trace_path']:
+        result['trace'] = settings['trace_path']
+        result['stages'] = job.tracer.stage_seconds()
+    return result
 
-    def transcribe_audio(self, audio_path):
-        try:
-            import soundfile as sf
-            import numpy as np
-            
-            # Ensure temp directory exists
-            if not os.path.exists(self.temp_dir):
-                os.makedirs(self.temp_dir)
-            
-            # Convert path to absolute path
-            audio_path = os.path.abspath(audio_path)
-            
-            # Verify audio file exists
-            if not os.path.exists(audio_path):
-                raise FileNotFoundError(f"Audio file not found: {audio_path}")
-            
-            # Read audio file
-            data, samplerate = sf.read(audio_path)
-            
-            if len(data.shape) > 1:
-                data = np.mean(data, axis=1)
-            
-            # Create whisper temp file with absolute path
-            temp_path = os.path.abspath(os.path.join(self.temp_dir, "temp_whisper.wav"))
-            
-            # Write audio file
-            sf.write(temp_path, data, samplerate)
-            
-            # Wait to ensure file is written
-            time.sleep(1)
-            
-            # Verify whisper temp file exists
-            if not os.path.exists(temp_path):
-                raise FileNotFoundError(f"Failed to create whisper temp file: {temp_path}")
-            
-            try:
-                # Load model and transcribe
-                model = whisper.load_model("base")
-                result = model.transcribe(temp_path, word_timestamps=True)
-                
-                if not result or 'segments' not in result:
-                    raise ValueError("Transcription failed - no segments generated")
-                
-                # Store transcription data with timestamps
-                self.transcription_data = []
-                for segment in result['segments']:
-                    words = []
-                    if 'words' in segment:
-                        for word in segment['words']:
-                            words.append({
-                                'text': word['text'],
-                                'start': word['start'],
-                                'end': word['end']
-                            })
-                    else:
-                        words.append({
-                            'text': segment['text'],
-                            'start': segment['start'],
-                            'end': segment['end']
-                        })
-                    self.transcription_data.append({
-                        'text': segment['text'],
-                        'start': segment['start'],
-                        'end': segment['end'],
-                        'words': words
-                    })
-                
-                # Return combined text for backward compatibility
-                return ' '.join(segment['text'] for segment in self.transcription_data)
-            finally:
-                # Clean up whisper temp file
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except:
-                        pass
-            
-        except Exception as e:
-            print(f"Error in transcription: {str(e)}")
-            self.update_status(f"Transcription error: {str(e)}")
-            raise
+def run_batch(video_paths, font_path, workers=1, output_dir=None, temp_dir=None, render_mode='events',
+              model_name=DEFAULT_WHISPER_MODEL, use_cache=True, transcribe_workers=1,
+              output_mode='greenscreen', alpha_codec='png', export_subtitles=False, animation='static',
+              trace_dir=None, profile=False, progress='console', encode_workers=4,
+              encoder_preset='default', live_format='fmp4', window_seconds=LIVE_WINDOW_SECONDS):
+    temp_dir = temp_dir or os.path.join(os.path.expanduser("~"), "BeastFont_temp")
+    settings = []
+    taken = set()
+    for index, video_path in enumerate(video_paths):
+        output_path = output_path_for(video_path, output_mode, alpha_codec, output_dir,
+                                      live_format if render_mode == 'incremental' else None)
+        # Inputs sharing a name (shows/*/episode.mp4 into one --output-dir,
+        # or clip.mov next to clip.mp4) would write the same file; later
+        # ones are numbered like the traces below
+        base, extension = os.path.splitext(output_path)
+        number = index
+        while os.path.normcase(output_path) in taken:
+            output_path = f"{base}_{number:03d}{extension}"
+            number += 1
+        taken.add(os.path.normcase(output_path))
+        # Traces are numbered so videos with the same name never collide
+        trace_path = profile_dir = None
+        if trace_dir:
+            stem = f"{index:03d}_{Path(video_path).stem}"
+            trace_path = os.path.join(trace_dir, stem + ".trace.json")
+            if profile:
+                profile_dir = os.path.join(trace_dir, stem + "_profile")
+        settings.append({
+            'video_path': video_path,
+            'font_path': os.path.abspath(font_path),
+            'temp_dir': temp_dir,
+            'output_path': output_path,
+            'render_mode': render_mode,
+            'model_name': model_name,
+            'use_cache': use_cache,
+            'transcribe_workers': transcribe_workers,
+            'output_mode': output_mode,
+            'alpha_codec': alpha_codec,
+            'export_subtitles': export_subtitles,
+            'animation': animation,
+            'encode_workers': encode_workers,
+            'encoder_preset': encoder_preset,
+            'live_format': live_format,
+            'window_seconds': window_seconds,
+            'trace_path': trace_path,
+            'profile_dir': profile_dir,
+            'progress': progress,
+        })
 
-    def generate_frame(self, frame_text, output_path, width=1920, height=1080):
-        # Create a new green screen frame with the current text state
-        img = Image.new('RGB', (width, height), color=(0, 255, 0))
-        draw = ImageDraw.Draw(img)
+    if workers <= 1:
+        return [_run_batch_job(job_settings) for job_settings in settings]
 
-        try:
-            font = ImageFont.truetype(self.font_path, 120)
-        except IOError:
-            font = ImageFont.load_default()
+    context = multiprocessing.get_context('spawn')
+    started = time.time()
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [executor.submit(_run_batch_job, job_settings) for job_settings in settings]
+        for job_settings, future in zip(settings, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # A worker that died hard (e.g. OOM-killed) breaks the pool;
+                # its job and any not yet started are reported as failed
+                results.append({'video': job_settings['video_path'], 'status': 'failed',
+                                'error': f"{type(e).__name__}: {e}",
+                                'seconds': round(time.time() - started, 3)})
+    return results
 
-        # Text wrapping
-        max_width = width - 100
-        words = frame_text.split()
-        lines = []
-        current_line = []
-        
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            text_width = draw.textlength(test_line, font=font)
-            if text_width <= max_width:
-                current_line.append(word)
-            else:
-                lines.append(' '.join(current_line))
-                current_line = [word]
-        lines.append(' '.join(current_line))
+def print_batch_report(results):
+    print()
+    print(f"{'Status':<8} {'Time (s)':>9}  Video")
+    for result in results:
+        print(f"{result['status'].upper():<8} {result['seconds']:>9.1f}  {result['video']}")
+        if result['status'] == 'ok':
+            print(f"{'':<19} -> {result['output']}")
+        else:
+            print(f"{'':<19} !! {result['error']}")
+    failed = sum(1 for result in results if result['status'] != 'ok')
+    print(f"\n{len(results) - failed} succeeded, {failed} failed")
 
-        # Calculate positions
-        total_height = sum(font.getbbox(line)[3] - font.getbbox(line)[1] for line in lines)
-        y = (height - total_height) // 2
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate MrBeast-style caption videos. Without any videos the GUI is started.")
+    parser.add_argument('videos', nargs='*',
+                        help="video files, directories or glob patterns to process headless")
+    parser.add_argument('--font', help="TTF/OTF font file used for the captions")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of videos processed in parallel (default: 1)")
+    parser.add_argument('--output-dir', help="directory for output videos (default: next to each input)")
+    parser.add_argument('--temp-dir', help="base directory for per-job scratch directories")
+    parser.add_argument('--render-mode', choices=RENDER_MODES, default='events')
+    parser.add_argument('--output-mode', choices=OUTPUT_MODES, default='greenscreen',
+                        help="green screen video, captions burnt onto the source, or transparent captions")
+    parser.add_argument('--alpha-codec', choices=sorted(ALPHA_CODECS), default='png',
+                        help="encoder for --output-mode alpha (default: png in MOV)")
+    parser.add_argument('--model', choices=WHISPER_MODELS, default=DEFAULT_WHISPER_MODEL,
+                        help="Whisper model used for transcription")
+    parser.add_argument('--transcribe-workers', type=int, default=1,
+                        help="processes used to transcribe long recordings in chunks")
+    parser.add_argument('--encode-workers', type=int, default=4,
+                        help="encoder processes used by the 'segments' render mode (default: 4)")
+    parser.add_argument('--encoder-preset', choices=list(ENCODER_PRESETS), default='default',
+                        help="x264 settings; 'stillimage' and 'fast' suit static captions")
+    parser.add_argument('--live-format', choices=LIVE_FORMATS, default='fmp4',
+                        help="container for the 'incremental' render mode: fragmented MP4 or HLS")
+    parser.add_argument('--window-seconds', type=float, default=LIVE_WINDOW_SECONDS,
+                        help="audio read and transcribed per step by the 'incremental' render mode "
+                             f"(default: {LIVE_WINDOW_SECONDS})")
+    parser.add_argument('--animation', choices=ANIMATIONS, default='static',
+                        help="'highlight' pops the word currently being spoken")
+    parser.add_argument('--export-ass', action='store_true',
+                        help="also write the captions as an ASS subtitle file with karaoke timing")
+    parser.add_argument('--no-cache', action='store_true', help="ignore the transcription cache")
+    parser.add_argument('--report', help="write the per-job results as JSON to this file")
+    parser.add_argument('--progress', choices=sorted(PROGRESS_REPORTERS), default='console',
+                        help="progress output: readable lines, or one JSON event per line (default: console)")
+    parser.add_argument('--trace-dir',
+                        help="write a Chrome trace (chrome://tracing, Perfetto) of every job to this directory")
+    parser.add_argument('--profile', action='store_true',
+                        help="also run each stage under cProfile, one .prof file per stage (needs --trace-dir)")
+    args = parser.parse_args(argv)
+    if args.videos and not args.font:
+        parser.error("--font is required when processing videos headless")
+    if args.font and not os.path.isfile(args.font):
+        # Pillow would quietly fall back to its default font
+        parser.error(f"font file not found: {args.font}")
+    if args.workers < 1 or args.transcribe_workers < 1 or args.encode_workers < 1:
+        parser.error("worker counts must be at least 1")
+    if args.render_mode == 'frames' and args.output_mode != 'greenscreen':
+        parser.error("the 'frames' render mode only supports green screen output")
+    if args.render_mode == 'frames' and args.animation != 'static':
+        parser.error("the 'frames' render mode only supports static captions")
+    if args.render_mode == 'ass' and args.animation != 'static':
+        parser.error("the 'ass' render mode only supports static captions")
+    if args.render_mode == 'segments' and args.output_mode == 'burnin':
+        parser.error("the 'segments' render mode does not support burn-in output")
+    if args.render_mode == 'incremental' and args.output_mode == 'alpha':
+        parser.error("the 'incremental' render mode does not support alpha output")
+    if args.window_seconds <= 0:
+        parser.error("--window-seconds must be positive")
+    if args.profile and not args.trace_dir:
+        parser.error("--profile needs --trace-dir")
+    return args
 
-        # Draw lines
-        for line in lines:
-            text_width = draw.textlength(line, font=font)
-            x = (width - text_width) // 2
-            draw.text((x, y), line, fill=(0, 0, 0), font=font)
-            y += font.getbbox(line)[3] - font.getbbox(line)[1] + 10
+def main(argv=None):
+    args = parse_args(argv)
 
-        img.save(output_path)
+    if not args.videos:
+        from tkinterdnd2 import TkinterDnD
+        root = TkinterDnD.Tk()
+        app = VideoToGreenScreenApp(root)
+        root.mainloop()
+        return 0
 
-    def generate_frames(self, fps=30):
-        if not hasattr(self, 'transcription_data'):
-            raise ValueError("No transcription data available. Run transcribe_audio first.")
-            
-        # Create frames directory
-        frames_dir = os.path.join(self.temp_dir, "frames")
-        os.makedirs(frames_dir, exist_ok=True)
-        
-        try:
-            # Calculate total frames needed
-            total_duration = max(segment['end'] for segment in self.transcription_data)
-            total_frames = int(total_duration * fps)
-            
-            # Track current text state
-            current_text = ""
-            last_frame_path = None
-            frame_paths = []
-            
-            # Prepare segments with simple text splitting
-            segments = []
-            words_per_segment = 6  # Number of words per segment
-            
-            for segment in self.transcription_data:
-                # Get segment text safely
-                segment_text = segment.get('text', '').strip()
-                if not segment_text:
-                    continue
-                
-                # Split text into words
-                words = segment_text.split()
-                if not words:
-                    continue
-                
-                # Create segments of fixed size
-                for i in range(0, len(words), words_per_segment):
-                    word_chunk = words[i:i + words_per_segment]
-                    chunk_text = ' '.join(word_chunk)
-                    
-                    # Calculate timing based on segment duration
-                    segment_duration = segment['end'] - segment['start']
-                    words_per_chunk = len(word_chunk)
-                    total_words = len(words)
-                    
-                    # Calculate start and end times for this chunk
-                    start_time = segment['start'] + (i * segment_duration / total_words)
-                    end_time = start_time + (words_per_chunk * segment_duration / total_words)
-                    
-                    # Add some padding to keep text visible longer
-                    end_time += 0.5  # Keep text visible for 0.5 seconds after it should disappear
-                    
-                    segments.append({
-                        'text': chunk_text,
-                        'start': start_time,
-                        'end': end_time
-                    })
-            
-            # Sort segments by start time
-            segments.sort(key=lambda x: x['start'])
-            
-            # Generate frames
-            for frame_num in range(total_frames):
-                current_time = frame_num / fps
-                
-                # Update text based on timing
-                text_changed = False
-                visible_segments = []
-                
-                for segment in segments:
-                    if segment['start'] <= current_time <= segment['end']:
-                        visible_segments.append(segment['text'])
-                
-                new_text = ' '.join(visible_segments)
-                if new_text != current_text:
-                    current_text = new_text
-                    text_changed = True
-                
-                # Only generate new frame if text changed
-                if text_changed or not frame_paths:
-                    frame_path = os.path.join(frames_dir, f"frame_{frame_num:06d}.jpg")
-                    self.generate_frame(current_text.strip(), frame_path)
-                    last_frame_path = frame_path
-                else:
-                    # Reuse last frame by creating a copy
-                    frame_path = os.path.join(frames_dir, f"frame_{frame_num:06d}.jpg")
-                    shutil.copy2(last_frame_path, frame_path)
-                
-                frame_paths.append(frame_path)
-                
-                # Update progress
-                progress = (frame_num + 1) / total_frames * 100
-                self.progress_var.set(progress)
-                self.update_status(f"Generating frames: {progress:.1f}%")
-                self.master.update_idletasks()
-            
-            return frames_dir
-            
-        except Exception as e:
-            # Clean up frames directory on error
-            shutil.rmtree(frames_dir, ignore_errors=True)
-            raise e
+    video_paths = expand_video_paths(args.videos)
+    if not video_paths:
+        print("No video files matched", file=sys.stderr)
+        return 1
 
-    def generate_green_screen(self, text, output_path, width=1920, height=1080):
-        # Generate frames directory
-        frames_dir = self.generate_frames()
-        
-        # Use the last frame as the output image
-        frame_files = sorted(os.listdir(frames_dir))
-        if not frame_files:
-            raise ValueError("No frames were generated")
-            
-        last_frame = os.path.join(frames_dir, frame_files[-1])
-        shutil.copy2(last_frame, output_path)
-        
-        # Clean up frames directory
-        try:
-            shutil.rmtree(frames_dir)
-        except:
-            pass
+    results = run_batch(
+        video_paths, args.font,
+        workers=args.workers,
+        output_dir=args.output_dir,
+        temp_dir=args.temp_dir,
+        render_mode=args.render_mode,
+        model_name=args.model,
+        use_cache=not args.no_cache,
+        transcribe_workers=args.transcribe_workers,
+        output_mode=args.output_mode,
+        alpha_codec=args.alpha_codec,
+        export_subtitles=args.export_ass,
+        animation=args.animation,
+        trace_dir=args.trace_dir,
+        profile=args.profile,
+        progress=args.progress,
+        encode_workers=args.encode_workers,
+        encoder_preset=args.encoder_preset,
+        live_format=args.live_format,
+        window_seconds=args.window_seconds,
+    )
+    if args.progress == 'json':
+        print_progress_json({'type': 'report', 'results': results})
+    else:
+        print_batch_report(results)
 
-    def create_final_video(self, image_path, output_path):
-        # Generate frames with animated text
-        self.update_status("Creating animated text frames...")
-        frames_dir = self.generate_frames()
-        
-        try:
-            # Create output directory
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Get video properties
-            clip = moviepy.editor.VideoFileClip(self.video_path)
-            duration = clip.duration
-            fps = 30  # Fixed fps for smooth animation
-            clip.close()
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
 
-            # Create video from frame sequence using ffmpeg
-            self.update_status("Creating final video from frames...")
-            frame_pattern = os.path.join(frames_dir, 'frame_%06d.jpg')
-            stream = ffmpeg.input(frame_pattern, pattern_type='sequence', framerate=fps)
-            stream = ffmpeg.output(stream, output_path, vcodec='libx264', pix_fmt='yuv420p')
-            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
-            
-            # Wait to ensure file is written
-            time.sleep(2)
-            
-            # Verify output file exists
-            if not os.path.exists(output_path):
-                raise FileNotFoundError(f"Failed to create final video: {output_path}")
-                
-        except ffmpeg.Error as e:
-            print(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
-            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
-        except Exception as e:
-            print(f"Error creating final video: {str(e)}")
-            raise
-        finally:
-            # Clean up frames directory
-            try:
-                if os.path.exists(frames_dir):
-                    shutil.rmtree(frames_dir)
-            except:
-                pass
+    return 0 if all(result['status'] == 'ok' for result in results) else 1
 
 if __name__ == "__main__":
-    root = TkinterDnD.Tk()
-    app = VideoToGreenScreenApp(root)
-    root.mainloop()
+    sys.exit(main())
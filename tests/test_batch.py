@@ -0,0 +1,51 @@
+import concurrent.futures
+import os
+import sys
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+def planned_outputs(monkeypatch, video_paths, **options):
+    monkeypatch.setattr(main, '_run_batch_job', lambda settings: settings['output_path'])
+    return main.run_batch(video_paths, 'font.ttf', **options)
+
+def test_inputs_sharing_a_name_get_distinct_outputs(monkeypatch, tmp_path):
+    videos = [str(tmp_path / show / 'episode.mp4') for show in ('a', 'b', 'c')]
+    outputs = planned_outputs(monkeypatch, videos, output_dir=str(tmp_path / 'out'))
+    assert len(set(outputs)) == 3
+    assert outputs[0] == str(tmp_path / 'out' / 'episode_greenscreen.mp4')
+
+def test_inputs_differing_only_in_extension_get_distinct_outputs(monkeypatch, tmp_path):
+    videos = [str(tmp_path / 'clip.mp4'), str(tmp_path / 'clip.mov')]
+    assert len(set(planned_outputs(monkeypatch, videos))) == 2
+
+class BrokenPool:
+    # Stands in for a pool whose worker was OOM-killed on the second job
+    def __init__(self, max_workers, mp_context):
+        self.submitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, function, settings):
+        self.submitted += 1
+        future = concurrent.futures.Future()
+        if self.submitted == 1:
+            future.set_result({'video': settings['video_path'], 'status': 'ok',
+                               'output': settings['output_path'], 'seconds': 1.0})
+        else:
+            future.set_exception(BrokenProcessPool('A process in the process pool was terminated abruptly'))
+        return future
+
+def test_a_worker_dying_hard_is_reported_as_a_failed_job(monkeypatch, tmp_path):
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', BrokenPool)
+    videos = [str(tmp_path / name) for name in ('a.mp4', 'b.mp4', 'c.mp4')]
+    results = main.run_batch(videos, 'font.ttf', workers=2)
+    assert [result['video'] for result in results] == videos
+    assert [result['status'] for result in results] == ['ok', 'failed', 'failed']
+    assert 'BrokenProcessPool' in results[1]['error']
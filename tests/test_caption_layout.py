@@ -0,0 +1,110 @@
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+FONT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    'fixtures', 'fonts', 'Lato-Regular.ttf')
+VOCABULARY = ("the", "longest", "circle", "challenge", "wins", "today", "million", "dollars")
+
+class FakeClip:
+    def __init__(self, size):
+        self.size = size
+        self.fps = 30.0
+
+    def close(self):
+        pass
+
+def transcript(segment_count=20, words_per_segment=8):
+    # Back-to-back segments, so neighbouring caption chunks overlap on screen
+    segments = []
+    start = 0.0
+    for index in range(segment_count):
+        words = [{'text': ' ' + VOCABULARY[(index + position) % len(VOCABULARY)],
+                  'start': start + position * 0.3, 'end': start + (position + 1) * 0.3}
+                 for position in range(words_per_segment)]
+        segments.append({'text': ''.join(word['text'] for word in words), 'start': start,
+                         'end': words[-1]['end'], 'words': words})
+        start = words[-1]['end'] + 0.1
+    return segments
+
+def probed_job(monkeypatch, tmp_path, size, animation):
+    editor = types.ModuleType('moviepy.editor')
+    editor.VideoFileClip = lambda path: FakeClip(size)
+    moviepy = types.ModuleType('moviepy')
+    moviepy.editor = editor
+    monkeypatch.setitem(sys.modules, 'moviepy', moviepy)
+    monkeypatch.setitem(sys.modules, 'moviepy.editor', editor)
+    job = main.CaptionJob('clip.mp4', FONT, str(tmp_path), status_callback=lambda message: None,
+                          use_cache=False, animation=animation)
+    job.transcription_data = job.segment_records(transcript())
+    return job
+
+@pytest.mark.parametrize('size', [(1280, 720), (1080, 1920), (320, 240)])
+@pytest.mark.parametrize('animation', ['static', 'highlight'])
+def test_caption_bounds_fit_inside_the_frame(monkeypatch, tmp_path, size, animation):
+    job = probed_job(monkeypatch, tmp_path, size, animation)
+    width, height, fps = job.source_info()
+    assert (width, height) == size
+    highlight_size = None
+    if animation == 'highlight':
+        highlight_size = max(1, round(job.font_size * main.HIGHLIGHT_SCALE))
+
+    for text, _, _ in job.caption_states(fps):
+        bounds = main.caption_layout.text_bounds(text, FONT, job.font_size, width, height,
+                                                 highlight_size)
+        if bounds is None:
+            continue
+        x0, y0, x1, y1 = bounds
+        assert 0 <= x0 and x1 <= width and 0 <= y0 and y1 <= height, (text, bounds)
+
+def test_font_scales_with_the_shorter_side(monkeypatch, tmp_path):
+    assert main.font_size_for(1920, 1080) == main.BASE_FONT_SIZE
+    assert main.font_size_for(1080, 1920) == main.BASE_FONT_SIZE
+    job = probed_job(monkeypatch, tmp_path, (1280, 720), 'static')
+    job.source_info()
+    assert job.font_size == 80
+
+def overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+@pytest.mark.parametrize('size', [(1920, 1080), (1280, 720), (1080, 1920)])
+def test_highlighted_word_stays_clear_of_its_neighbours(size):
+    text = "the longest circle challenge wins today"
+    compositor = main.FrameCompositor(*size, FONT, main.font_size_for(*size))
+    words = compositor.caption_words(text)
+    for active in range(len(words)):
+        sprite = compositor.rect_of(compositor.highlight_sprite(text, active))
+        for index, placed in enumerate(words):
+            if index != active:
+                assert not overlaps(sprite, compositor.rect_of(placed)), (active, index)
+
+def test_highlight_bounds_cover_every_highlighted_frame():
+    width, height = 1280, 720
+    text = "the longest circle challenge wins today if you can last"
+    font_size = main.font_size_for(width, height)
+    highlight_size = max(1, round(font_size * main.HIGHLIGHT_SCALE))
+    x0, y0, x1, y1 = main.caption_layout.text_bounds(text, FONT, font_size, width, height, highlight_size)
+    compositor = main.FrameCompositor(width, height, FONT, font_size)
+    for active in range(len(text.split())):
+        for placed in compositor.caption_words(text) + [compositor.highlight_sprite(text, active)]:
+            left, top, right, bottom = compositor.rect_of(placed)
+            assert x0 <= left and y0 <= top and right <= x1 + 1 and bottom <= y1 + 1
+
+def test_incremental_highlight_matches_a_full_redraw():
+    width, height = 640, 360
+    texts = ["the longest circle challenge wins today", "one million dollars"]
+    incremental = main.FrameCompositor(width, height, FONT, main.font_size_for(width, height), pool_size=1)
+    states = [(text, active) for text in texts for active in range(-1, len(text.split()))]
+    for text, active in states + states[::-1]:
+        index = incremental.compose(text, active)
+        frame = incremental.frame(index).copy()
+        incremental.release(index)
+        fresh = main.FrameCompositor(width, height, FONT, main.font_size_for(width, height), pool_size=1)
+        expected = fresh.frame(fresh.compose(text, active))
+        assert (frame == expected).all(), (text, active)
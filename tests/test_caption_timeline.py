@@ -0,0 +1,88 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+FRAME_RATES = [24, 25, 30000 / 1001, 30, 60]
+
+def random_segments(rng, count=40, duration=30.0):
+    # Overlapping captions with times on a coarse grid, so starts, ends and
+    # frame timestamps often coincide exactly
+    segments = []
+    for _ in range(count):
+        start = round(rng.uniform(0, duration), 1)
+        words = []
+        word_start = start
+        for _ in range(rng.randint(1, 5)):
+            word_end = round(word_start + rng.choice([0.1, 0.2, 0.5, 1.0]), 1)
+            words.append(main.TimedWord(f" w{rng.randint(0, 99)}", word_start, word_end))
+            word_start = round(word_end + rng.choice([0.0, 0.0, 0.1]), 1)
+        end = words[-1].end if rng.random() < 0.8 else round(start + rng.uniform(0, 2), 1)
+        text = ' '.join(word.text for word in words)
+        segments.append(main.TranscriptSegment(text, start, end, words))
+    return segments
+
+def visible_by_scan(segments, time_point):
+    return [segment for segment in sorted(segments, key=lambda x: x.start)
+            if segment.start <= time_point <= segment.end]
+
+def text_by_scan(segments, time_point):
+    return ' '.join(segment.text for segment in visible_by_scan(segments, time_point)).strip()
+
+def active_word_by_scan(segments, time_point):
+    active = -1
+    offset = 0
+    for segment in visible_by_scan(segments, time_point):
+        words = segment.words
+        for i, word in enumerate(words):
+            word_end = words[i + 1].start if i + 1 < len(words) else word.end
+            if word.start <= time_point < max(word_end, word.start):
+                active = offset + i
+        offset += len(segment.text.split())
+    return active
+
+def expand_runs(runs):
+    frames = []
+    for run in runs:
+        frames.extend([run[:-2]] * run[-1])
+    return frames
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('fps', FRAME_RATES)
+def test_frame_runs_match_a_linear_scan(seed, fps):
+    rng = random.Random(seed)
+    segments = random_segments(rng)
+    timeline = main.CaptionTimeline(segments)
+    total_frames = int(32 * fps)
+    expected = [(text_by_scan(segments, frame / fps),) for frame in range(total_frames)]
+
+    for frame in range(0, total_frames, 7):
+        assert timeline.text_at(frame / fps) == expected[frame][0]
+
+    for start_frame in [0, 1, rng.randrange(total_frames), total_frames - 1]:
+        runs = timeline.frame_runs(fps, total_frames, start_frame)
+        assert runs[0][1] == start_frame
+        assert expand_runs(runs) == expected[start_frame:]
+        assert all(a[0] != b[0] for a, b in zip(runs, runs[1:]))
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('fps', FRAME_RATES)
+def test_word_runs_match_a_linear_scan(seed, fps):
+    rng = random.Random(seed)
+    segments = random_segments(rng)
+    timeline = main.CaptionTimeline(segments)
+    total_frames = int(32 * fps)
+    expected = []
+    for frame in range(total_frames):
+        text = text_by_scan(segments, frame / fps)
+        expected.append((text, active_word_by_scan(segments, frame / fps) if text else -1))
+
+    for start_frame in [0, rng.randrange(total_frames)]:
+        runs = timeline.word_runs(fps, total_frames, start_frame)
+        assert runs[0][2] == start_frame
+        assert expand_runs(runs) == expected[start_frame:]
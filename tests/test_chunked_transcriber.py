@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+SAMPLE_RATE = 16000
+WORD_SECONDS = 0.5
+WORDS_PER_SEGMENT = 8
+
+def transcribe_range(chunk_start, chunk_end):
+    # Stands in for Whisper on audio[chunk_start:chunk_end]: a word every
+    # WORD_SECONDS of the recording, grouped into segments from the first
+    # word the chunk hears, timed relative to the chunk
+    offset = chunk_start / SAMPLE_RATE
+    words = []
+    index = 0
+    while (index + 1) * WORD_SECONDS <= chunk_end / SAMPLE_RATE:
+        if index * WORD_SECONDS >= offset:
+            words.append({'text': f" w{index}", 'start': index * WORD_SECONDS - offset,
+                          'end': (index + 1) * WORD_SECONDS - offset})
+        index += 1
+    segments = []
+    for first in range(0, len(words), WORDS_PER_SEGMENT):
+        segment_words = words[first:first + WORDS_PER_SEGMENT]
+        segments.append({
+            'text': ''.join(word['text'] for word in segment_words),
+            'start': segment_words[0]['start'],
+            'end': segment_words[-1]['end'],
+            'words': segment_words,
+        })
+    return segments
+
+def stitch(cut_seconds, total_seconds, overlap_seconds=2):
+    transcriber = main.ChunkedTranscriber('stub', 2, overlap_seconds=overlap_seconds)
+    total = int(total_seconds * SAMPLE_RATE)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    cuts = [0] + [int(seconds * SAMPLE_RATE) for seconds in cut_seconds] + [total]
+    chunks = [(max(0, start - overlap), start, end, min(total, end + overlap))
+              for start, end in zip(cuts[:-1], cuts[1:])]
+    results = [transcribe_range(chunk_start, chunk_end) for chunk_start, _, _, chunk_end in chunks]
+    return transcriber.stitch(chunks, results, SAMPLE_RATE)
+
+def test_segment_straddling_a_cut_keeps_every_word_once():
+    # Chunk 2 hears a segment start in its pre-roll that runs well past the
+    # end of chunk 1's audio
+    segments = stitch([220.035], 400)
+    words = [word['text'] for segment in segments for word in segment['words']]
+    assert words == [f" w{index}" for index in range(800)]
+
+def test_trimmed_segments_are_rebuilt_from_their_words():
+    segments = stitch([220.035], 400)
+    for segment in segments:
+        assert segment['text'] == ''.join(word['text'] for word in segment['words'])
+        assert segment['start'] == segment['words'][0]['start']
+        assert segment['end'] == segment['words'][-1]['end']
+    starts = [segment['start'] for segment in segments]
+    assert starts == sorted(starts)
+
+def test_cache_key_ignores_chunking_for_audio_that_is_not_split():
+    job = main.CaptionJob(None, None, '.', status_callback=lambda message: None,
+                          transcribe_workers=2)
+    short = [0.0] * (10 * SAMPLE_RATE)
+    long = [0.0] * (400 * SAMPLE_RATE)
+    assert 'chunking' not in job.cache_options(short, SAMPLE_RATE)
+    assert 'chunking' in job.cache_options(long, SAMPLE_RATE)